@@ -0,0 +1,55 @@
+import argparse
+import os
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from Benchmarks.Common import generate_test_video, time_call, print_table
+from Components.Edits import extractAudio, decode_audio
+
+# ----------------------------------------------------------------------------
+# The previous path: main.py opened a VideoFileClip around extractAudio, which
+# opened another and wrote a full-rate stereo WAV through MoviePy.
+# ----------------------------------------------------------------------------
+
+
+def moviepy_extract(video_path, audio_path):
+    with VideoFileClip(video_path):
+        with VideoFileClip(video_path) as video_clip:
+            video_clip.audio.write_audiofile(audio_path, logger=None)
+    return audio_path
+
+# ----------------------------------------------------------------------------
+# Compare the MoviePy path against direct ffmpeg extraction and piping.
+# ----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark audio extraction paths.")
+    parser.add_argument("--video", help="Video to use (default: generated)")
+    parser.add_argument("--duration", type=int, default=3600,
+                        help="Length of the generated video in seconds")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    video_path = args.video or generate_test_video(args.duration)
+    wav_path = "temp_files/benchmarks/audio_extraction.wav"
+    os.makedirs(os.path.dirname(wav_path), exist_ok=True)
+
+    paths = {
+        "moviepy (old)": lambda: moviepy_extract(video_path, wav_path),
+        "ffmpeg wav 16k mono": lambda: extractAudio(video_path, wav_path),
+        "ffmpeg pipe -> numpy": lambda: decode_audio(video_path),
+    }
+
+    rows = []
+    for name, fn in paths.items():
+        seconds, _ = time_call(fn, args.repeat)
+        size = os.path.getsize(wav_path) if "wav" in name or "moviepy" in name else 0
+        rows.append({"path": name, "seconds": f"{seconds:.2f}",
+                     "wav MB": f"{size / 1e6:.1f}"})
+
+    os.remove(wav_path)
+    print_table(rows, ["path", "seconds", "wav MB"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import subprocess
+import time
+import ffmpeg
+
+# Generated media is cached here so repeated runs don't re-encode it
+MEDIA_DIR = "temp_files/benchmarks"
+
+# Script read by flite for the synthetic speech track (dramatic and calm lines
+# mixed, so the emotion classifier and the highlight scorer have material)
+SPEECH_SCRIPT = (
+    "I can't believe you did this to me. I am so angry right now. "
+    "Please, somebody help, I think something terrible is going to happen. "
+    "It was a quiet morning and we walked along the river. "
+    "I miss her every single day and it breaks my heart. "
+    "That is the best news I have heard all year, thank you so much. "
+)
+
+# Speech-like tone used when ffmpeg has no flite filter: a gliding pitch
+# with a syllable-rate envelope (no commas, so it needs no escaping)
+SPEECH_TONE = ("0.4*sin(2*PI*(150+30*sin(2*PI*0.5*t))*t)"
+               "*(0.5+0.5*sin(2*PI*4*t))*(0.6+0.4*sin(2*PI*0.2*t))")
+
+# ----------------------------------------------------------------------------
+# Generate a deterministic test video (lavfi pattern plus a stereo tone).
+# ----------------------------------------------------------------------------
+
+
+def generate_test_video(duration, width=1280, height=720, fps=30):
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    path = f"{MEDIA_DIR}/testsrc_{width}x{height}_{fps}fps_{duration}s.mp4"
+
+    # Reuse media that was generated by an earlier run
+    if os.path.exists(path):
+        return path
+
+    video = ffmpeg.input(
+        f"testsrc2=size={width}x{height}:rate={fps}", f="lavfi", t=duration)
+    audio = ffmpeg.input(
+        "aevalsrc=0.5*sin(2*PI*440*t)|0.5*sin(2*PI*660*t):s=44100", f="lavfi", t=duration)
+    ffmpeg.output(
+        video, audio, path,
+        **{'c:v': 'libx264', 'preset': 'ultrafast', 'c:a': 'aac', 'pix_fmt': 'yuv420p'}
+    ).overwrite_output().run(capture_stdout=True, capture_stderr=True)
+    return path
+
+# ----------------------------------------------------------------------------
+# Draw a simple synthetic face (skin-toned oval, eyes, brows, nose, mouth)
+# so the face tracker has something to follow.
+# ----------------------------------------------------------------------------
+
+
+def generate_face_image(size=256):
+    from PIL import Image, ImageDraw
+
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    path = f"{MEDIA_DIR}/face_{size}.png"
+    if os.path.exists(path):
+        return path
+
+    image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    s = size / 256
+    draw.ellipse([40 * s, 16 * s, 216 * s, 240 * s], fill=(224, 172, 140, 255))
+    for x in (88, 168):
+        draw.rectangle([(x - 26) * s, 76 * s, (x + 26) * s, 84 * s], fill=(70, 45, 30, 255))
+        draw.ellipse([(x - 20) * s, 96 * s, (x + 20) * s, 120 * s], fill=(255, 255, 255, 255))
+        draw.ellipse([(x - 9) * s, 99 * s, (x + 9) * s, 117 * s], fill=(40, 30, 20, 255))
+    draw.polygon([(128 * s, 110 * s), (112 * s, 160 * s), (144 * s, 160 * s)],
+                 fill=(196, 140, 110, 255))
+    draw.ellipse([92 * s, 176 * s, 164 * s, 204 * s], fill=(150, 50, 60, 255))
+    image.save(path)
+    return path
+
+# ----------------------------------------------------------------------------
+# Check whether this ffmpeg build has a given filter (e.g. flite).
+# ----------------------------------------------------------------------------
+
+
+def has_ffmpeg_filter(name):
+    result = subprocess.run(["ffmpeg", "-hide_banner", "-filters"],
+                            capture_output=True, text=True)
+    return any(line.split()[1:2] == [name] for line in result.stdout.splitlines())
+
+# ----------------------------------------------------------------------------
+# Generate a deterministic talking-head stand-in: a lavfi pattern with the
+# synthetic face drifting across it and a speech track (flite reading
+# SPEECH_SCRIPT on a loop, or a speech-like tone when flite isn't built in).
+# ----------------------------------------------------------------------------
+
+
+def generate_speech_video(duration, width=1280, height=720, fps=30):
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    flite = has_ffmpeg_filter("flite")
+    path = (f"{MEDIA_DIR}/speech_{'flite' if flite else 'tone'}_"
+            f"{width}x{height}_{fps}fps_{duration}s.mp4")
+    if os.path.exists(path):
+        return path
+
+    if flite:
+        # Render the script once, then loop it for the length of the video
+        script_path, speech_path = f"{MEDIA_DIR}/speech.txt", f"{MEDIA_DIR}/speech.wav"
+        if not os.path.exists(speech_path):
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write(SPEECH_SCRIPT)
+            ffmpeg.input(f"flite=textfile={script_path}", f="lavfi").output(
+                speech_path).overwrite_output().run(capture_stdout=True, capture_stderr=True)
+        audio = ffmpeg.input(speech_path, stream_loop=-1, t=duration)
+    else:
+        audio = ffmpeg.input(f"aevalsrc={SPEECH_TONE}:s=16000", f="lavfi", t=duration)
+
+    # The face drifts slowly left and right so the crop path has to follow it
+    face_size = height // 2
+    face = ffmpeg.input(generate_face_image(face_size), loop=1, framerate=fps, t=duration)
+    background = ffmpeg.input(
+        f"testsrc2=size={width}x{height}:rate={fps}", f="lavfi", t=duration)
+    video = background.overlay(face, x="(W-w)/2+(W-w)/3*sin(t/4)", y="(H-h)/3",
+                               shortest=1)
+    ffmpeg.output(
+        video, audio, path, t=duration,
+        **{'c:v': 'libx264', 'preset': 'ultrafast', 'c:a': 'aac', 'pix_fmt': 'yuv420p'}
+    ).overwrite_output().run(capture_stdout=True, capture_stderr=True)
+    return path
+
+# ----------------------------------------------------------------------------
+# Time a callable, returning (seconds, result) for the fastest of N runs.
+# ----------------------------------------------------------------------------
+
+
+def time_call(fn, repeat=1):
+    best, result = None, None
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - began
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+# ----------------------------------------------------------------------------
+# Print results as an aligned table.
+# ----------------------------------------------------------------------------
+
+
+def print_table(rows, columns):
+    widths = [max(len(str(c)), *(len(str(r[c])) for r in rows)) for c in columns]
+    print("  ".join(str(c).ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(w) for c, w in zip(columns, widths)))
@@ -0,0 +1,78 @@
+import argparse
+import time
+import numpy as np
+import torch
+from Benchmarks.Common import time_call, print_table
+from Benchmarks.EmotionThroughput import synthetic_segments
+from Components.SentimentAnalysis import classify_segments, get_emotion_analyzer, EMOTION_BACKENDS
+
+# ----------------------------------------------------------------------------
+# Per-call latency (milliseconds) of classifying one segment at a time.
+# ----------------------------------------------------------------------------
+
+
+def latencies(segments, analyzer, count):
+    times = []
+    for segment in segments[:count]:
+        began = time.perf_counter()
+        classify_segments([segment], analyzer, batch_size=1)
+        times.append((time.perf_counter() - began) * 1000)
+    return np.array(times)
+
+# ----------------------------------------------------------------------------
+# Compare throughput, latency and agreement of the emotion backends on a
+# fixed transcript.
+# ----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the PyTorch and ONNX Runtime emotion classifiers.")
+    parser.add_argument("--segments", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-samples", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=0,
+                        help="ONNX Runtime threads (0 = every core)")
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="largest score difference allowed between backends")
+    parser.add_argument("--min-agreement", type=float, default=0.98,
+                        help="smallest fraction of segments that must get the same label")
+    args = parser.parse_args()
+
+    segments = synthetic_segments(args.segments)
+
+    rows, results = [], {}
+    for backend in EMOTION_BACKENDS:
+        # Loading (and, the first time, exporting) is reported separately
+        load_seconds, (analyzer, device) = time_call(
+            lambda: get_emotion_analyzer(torch, backend, args.threads))
+        seconds, emotions = time_call(
+            lambda: classify_segments(segments, analyzer, args.batch_size))
+        latency = latencies(segments, analyzer, args.latency_samples)
+        results[backend] = emotions
+        rows.append({"backend": f"{backend} ({device})",
+                     "load (s)": f"{load_seconds:.2f}",
+                     "segments/sec": f"{len(segments) / seconds:.1f}",
+                     "p50 latency (ms)": f"{np.percentile(latency, 50):.1f}",
+                     "p95 latency (ms)": f"{np.percentile(latency, 95):.1f}"})
+
+    print_table(rows, ["backend", "load (s)", "segments/sec",
+                       "p50 latency (ms)", "p95 latency (ms)"])
+
+    # How closely the quantized model follows the original
+    reference, candidate = results["torch"], results["onnx"]
+    same_label = np.array([a["label"] == b["label"] for a, b in zip(reference, candidate)])
+    differences = np.array([abs(a["score"] - b["score"])
+                            for a, b in zip(reference, candidate) if a["label"] == b["label"]])
+    largest = differences.max() if len(differences) else 0.0
+    print(f"\nLabel agreement: {same_label.mean() * 100:.1f}%  "
+          f"largest score difference: {largest:.4f}")
+
+    if same_label.mean() < args.min_agreement or largest > args.tolerance:
+        print(f"Backends differ by more than the tolerance "
+              f"({args.min_agreement * 100:.0f}% agreement, {args.tolerance} score)")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import random
+import torch
+from Benchmarks.Common import time_call, print_table
+from Components.SentimentAnalysis import analyze_emotions
+
+# Sentences mixed into the synthetic transcript
+SENTENCES = [
+    "I can't believe you would do that to me after everything.",
+    "Honestly that was the best day of my whole life.",
+    "We should probably head home before it gets dark.",
+    "I'm terrified of what happens if this goes wrong.",
+    "It just makes me so sad to think about it now.",
+    "Okay, so the next thing we need to talk about is the budget.",
+]
+
+# ----------------------------------------------------------------------------
+# Build a deterministic transcript of N segments.
+# ----------------------------------------------------------------------------
+
+
+def synthetic_segments(count, seed=0):
+    rng = random.Random(seed)
+    segments = []
+    for i in range(count):
+        text = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 3)))
+        segments.append({"timestamp": [i * 4.0, i * 4.0 + 3.5], "text": text})
+    return segments
+
+# ----------------------------------------------------------------------------
+# Report emotion classification throughput for several batch sizes.
+# ----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark emotion classification throughput.")
+    parser.add_argument("--segments", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    segments = synthetic_segments(args.segments)
+    emotion_path = "temp_files/benchmarks/emotions.npz"
+    os.makedirs(os.path.dirname(emotion_path), exist_ok=True)
+
+    rows = []
+    for batch_size in args.batch_sizes:
+        def run():
+            # Remove the cached result so every run classifies from scratch
+            if os.path.exists(emotion_path):
+                os.remove(emotion_path)
+            return analyze_emotions(segments, emotion_path, None, torch, batch_size=batch_size)
+
+        # Warm the model registry so load time isn't measured
+        if not rows:
+            run()
+
+        seconds, emotions = time_call(run)
+        labelled = sum(1 for e in emotions if e["label"])
+        rows.append({"batch size": batch_size,
+                     "seconds": f"{seconds:.2f}",
+                     "segments/sec": f"{len(segments) / seconds:.1f}",
+                     "labelled": f"{labelled}/{len(segments)}"})
+
+    print_table(rows, ["batch size", "seconds", "segments/sec", "labelled"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import os
+import numpy as np
+from Benchmarks.Common import generate_test_video, time_call, print_table, MEDIA_DIR
+from Components.Edits import render_short, encode_threads, ENCODE_PROFILES
+from Components.Helpers import probe_video
+
+# ----------------------------------------------------------------------------
+# Compare encode speed and output size of every encode profile.
+#
+# Each profile renders the same clip with a fixed center crop, so only the
+# encoder settings differ between rows.
+# ----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark encode profiles (fps and output size).")
+    parser.add_argument("--video", help="Video to use (default: generated)")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="parallel renders the thread count is tuned for")
+    parser.add_argument("--profiles", nargs="+", default=list(ENCODE_PROFILES))
+    args = parser.parse_args()
+
+    video_path = args.video or generate_test_video(int(args.duration) + 1, 1920, 1080)
+    info = probe_video(video_path)
+    crop_width = min(info["width"], int(info["height"] * 9 / 16)) // 2 * 2
+    crop_path = np.array([(info["width"] - crop_width) // 2], dtype=np.int32)
+    frames = int(args.duration * info["fps"])
+    threads = encode_threads(args.workers)
+
+    rows = []
+    for profile in args.profiles:
+        output_path = f"{MEDIA_DIR}/encode_{profile}.mp4"
+        seconds, _ = time_call(lambda: render_short(
+            video_path, output_path, 0.0, args.duration, crop_path, crop_width, info["fps"],
+            profile=profile, threads=threads))
+        width, height = ENCODE_PROFILES[profile]["size"]
+        rows.append({"profile": profile, "size": f"{width}x{height}",
+                     "preset": ENCODE_PROFILES[profile]["preset"],
+                     "seconds": f"{seconds:.2f}", "encode fps": f"{frames / seconds:.1f}",
+                     "output MB": f"{os.path.getsize(output_path) / (1024 * 1024):.2f}"})
+
+    print(f"x264 threads per encode: {threads}")
+    print_table(rows, ["profile", "size", "preset", "seconds", "encode fps", "output MB"])
+
+
+if __name__ == "__main__":
+    main()
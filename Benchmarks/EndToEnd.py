@@ -0,0 +1,356 @@
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from Benchmarks.Common import generate_speech_video, time_call, print_table, MEDIA_DIR
+
+# ----------------------------------------------------------------------------
+# End-to-end benchmark suite.
+#
+# Generates deterministic media offline at several durations, then runs each
+# stage (and the whole pipeline) on it in a fresh interpreter, so every
+# measurement starts cold and gets its own peak RSS. Results are written as
+# JSON and can be checked against a stored baseline.
+# ----------------------------------------------------------------------------
+
+# Stages run by default, in order
+STAGES = ["extract_audio", "transcribe", "emotions", "face_crop", "subtitles", "pipeline"]
+
+# Lengths of the generated videos (seconds)
+DURATIONS = [30, 120]
+
+# Where the latest results and the stored baseline go
+RESULTS_PATH = "logs/benchmarks/end_to_end.json"
+BASELINE_PATH = "Benchmarks/baselines/end_to_end.json"
+
+# A run regresses when it is this much slower (or larger) than its baseline
+# (fraction) and by at least this much, to ignore noise on short stages
+TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 1.0
+MIN_REGRESSION_MB = 100
+
+# Scratch space for stage outputs (emptied before every stage)
+WORK_DIR = f"{MEDIA_DIR}/end_to_end"
+
+# Marks the line a stage process reports its result on
+RESULT_PREFIX = "BENCHMARK RESULT "
+
+# ----------------------------------------------------------------------------
+# Stage setups. Each prepares its inputs (untimed) and returns the call to
+# time plus the seconds of media that call processes.
+# ----------------------------------------------------------------------------
+
+
+def _extract_audio(video_path, duration, settings):
+    from Components.Edits import extractAudio
+
+    # extractAudio reports failure by returning None rather than raising
+    def run():
+        if extractAudio(video_path, f"{WORK_DIR}/audio.wav") is None:
+            raise RuntimeError("Audio extraction failed")
+    return run, duration
+
+
+def _transcribe(video_path, duration, settings):
+    import torch
+    from Components.Edits import decode_audio
+    from Components.Transcriptions import transcribe_audio, TRANSCRIPTION_MODES
+
+    audio = decode_audio(video_path)
+    params = TRANSCRIPTION_MODES[settings["transcription_mode"]]
+    return lambda: transcribe_audio(audio, f"{WORK_DIR}/transcript.npz", None, torch,
+                                    params), duration
+
+
+def _emotions(video_path, duration, settings):
+    import torch
+    from Components.Helpers import load_transcription_segments
+    from Components.SentimentAnalysis import analyze_emotions
+    from Benchmarks.EmotionThroughput import synthetic_segments
+
+    # Classify the real transcript, written beforehand by another process so
+    # Whisper never counts towards this stage's memory; a tone-only track has
+    # no words, so fall back to a synthetic transcript of the same length
+    transcript_path = transcript_path_for(video_path, settings)
+    segments = []
+    if os.path.exists(transcript_path):
+        segments = load_transcription_segments(transcript_path)
+    if not segments:
+        segments = synthetic_segments(max(1, int(duration / 4)))
+    return lambda: analyze_emotions(segments, f"{WORK_DIR}/emotions.npz", None, torch,
+                                    backend=settings["emotion_backend"]), duration
+
+
+def _face_crop(video_path, duration, settings):
+    from Components.Edits import detect_face_and_crop, MAX_CLIP_SECONDS
+
+    clip_seconds = min(duration, MAX_CLIP_SECONDS)
+    return lambda: detect_face_and_crop(video_path, f"{WORK_DIR}/crop.mp4", 0, clip_seconds,
+                                        profile=settings["encode_profile"]), clip_seconds
+
+
+def _subtitles(video_path, duration, settings):
+    from Components.Subtitles import write_srt, segment_subtitles, burn_subtitles
+    from Benchmarks.EmotionThroughput import synthetic_segments
+
+    segments = synthetic_segments(max(1, int(duration / 4)))
+    srt_path = f"{WORK_DIR}/subtitles.srt"
+
+    def run():
+        write_srt(segment_subtitles(segments, 0, duration), srt_path)
+        burn_subtitles(video_path, srt_path, f"{WORK_DIR}/subtitled.mp4",
+                       settings["encode_profile"])
+    return run, duration
+
+
+def _pipeline(video_path, duration, settings):
+    from Components.Jobs import Job
+    from Components.Pipeline import process_video, pipeline_stages
+
+    # A fresh key per run, so nothing is served from the artifact cache
+    file_hash = f"benchmark{int(time.time() * 1000)}"
+    job = Job(file_hash, pipeline_stages(settings), {})
+
+    def run():
+        try:
+            process_video(video_path, file_hash, settings, job, remove_source=False)
+        finally:
+            for path in glob.glob(f"temp_files/{file_hash}_*"):
+                os.remove(path)
+        return {record["stage"]: round(record["wall_seconds"], 3)
+                for record in job.metrics.records if record["type"] == "stage"}
+    return run, duration
+
+
+STAGE_SETUPS = {
+    "extract_audio": _extract_audio,
+    "transcribe": _transcribe,
+    "emotions": _emotions,
+    "face_crop": _face_crop,
+    "subtitles": _subtitles,
+    "pipeline": _pipeline,
+}
+
+# ----------------------------------------------------------------------------
+# Where the transcript of a generated video is kept (it's deterministic, so
+# it is reused across runs like the media itself).
+# ----------------------------------------------------------------------------
+
+
+def transcript_path_for(video_path, settings):
+    return f"{os.path.splitext(video_path)[0]}_{settings['transcription_mode']}_transcript.npz"
+
+# ----------------------------------------------------------------------------
+# Transcribe a generated video in this process (the child side of
+# prepare_transcript).
+# ----------------------------------------------------------------------------
+
+
+def write_transcript(video_path, settings):
+    import torch
+    from Components.Edits import decode_audio
+    from Components.Transcriptions import transcribe_audio, TRANSCRIPTION_MODES
+
+    transcribe_audio(decode_audio(video_path), transcript_path_for(video_path, settings), None,
+                     torch, TRANSCRIPTION_MODES[settings["transcription_mode"]])
+
+# ----------------------------------------------------------------------------
+# Make sure a video's transcript exists, writing it in a separate process
+# so the emotion stage's process never loads Whisper.
+# ----------------------------------------------------------------------------
+
+
+def prepare_transcript(video_path, settings):
+    if os.path.exists(transcript_path_for(video_path, settings)):
+        return
+
+    result = subprocess.run(
+        [sys.executable, "-m", "Benchmarks.EndToEnd", "--write-transcript",
+         "--video", video_path, "--settings", json.dumps(settings)],
+        capture_output=True, text=True)
+    if result.returncode != 0:
+        # *** Debugging Message *** #
+        print("Transcription Failed; The Emotion Stage Will Use A Synthetic Transcript...")
+
+# ----------------------------------------------------------------------------
+# Run one stage in this process and print its result (the child side).
+# ----------------------------------------------------------------------------
+
+
+def run_stage(stage, video_path, duration, settings):
+    from Components.Instrumentation import peak_rss_mb
+
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    os.makedirs(WORK_DIR, exist_ok=True)
+
+    fn, media_seconds = STAGE_SETUPS[stage](video_path, duration, settings)
+    seconds, breakdown = time_call(fn)
+    own, children = peak_rss_mb()
+
+    result = {"seconds": seconds, "media_seconds": media_seconds,
+              "realtime": media_seconds / max(seconds, 1e-9),
+              "peak_rss_mb": own, "child_peak_rss_mb": children}
+    if isinstance(breakdown, dict):
+        result["stages"] = breakdown
+    print(RESULT_PREFIX + json.dumps(result))
+
+# ----------------------------------------------------------------------------
+# Run one stage in a fresh interpreter and return its result (the parent
+# side). Returns an "error" entry instead when the stage fails.
+# ----------------------------------------------------------------------------
+
+
+def measure(stage, video_path, duration, settings):
+    result = subprocess.run(
+        [sys.executable, "-m", "Benchmarks.EndToEnd", "--run-stage", stage,
+         "--video", video_path, "--durations", str(duration),
+         "--settings", json.dumps(settings)],
+        capture_output=True, text=True)
+
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    return {"error": (result.stderr.strip() or result.stdout.strip())[-2000:]}
+
+# ----------------------------------------------------------------------------
+# Compare a result with its baseline, returning what regressed.
+# ----------------------------------------------------------------------------
+
+
+def regressions(result, previous):
+    regressed = []
+    if result["seconds"] > previous["seconds"] * (1 + TOLERANCE) and \
+            result["seconds"] - previous["seconds"] >= MIN_REGRESSION_SECONDS:
+        regressed.append("time")
+
+    # Peak memory is only compared where the platform reports it
+    for key in ("peak_rss_mb", "child_peak_rss_mb"):
+        now, before = result.get(key), previous.get(key)
+        if now is not None and before is not None and now > before * (1 + TOLERANCE) and \
+                now - before >= MIN_REGRESSION_MB:
+            regressed.append("memory")
+            break
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark every stage and the full pipeline on generated media.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--durations", type=int, nargs="+", default=DURATIONS)
+    parser.add_argument("--transcription-mode", default="cpu")
+    parser.add_argument("--emotion-backend", default="torch")
+    parser.add_argument("--profile", default="draft", help="encode profile for rendered output")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--check", action="store_true",
+                        help="exit non-zero if a stage failed or regressed against the baseline")
+
+    # Used internally to run a single stage in a child process
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--write-transcript", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--video", help=argparse.SUPPRESS)
+    parser.add_argument("--settings", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage(args.run_stage, args.video, args.durations[0], json.loads(args.settings))
+        return
+    if args.write_transcript:
+        write_transcript(args.video, json.loads(args.settings))
+        return
+
+    # The same settings the batch CLI uses, with one clip and a fast encode
+    settings = {
+        "num_clips": 1,
+        "render_workers": 2,
+        "transcription_mode": args.transcription_mode,
+        "emotion_backend": args.emotion_backend,
+        "encode_profile": args.profile,
+        "caption_style": "segments",
+        "streaming": False,
+    }
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+
+        # A baseline taken with other settings did different work
+        if stored["settings"] == settings:
+            baseline = stored["results"]
+        elif args.check:
+            print(f"Baseline {args.baseline} used other settings; "
+                  f"store one for these with --save-baseline first")
+            raise SystemExit(1)
+        else:
+            print(f"Baseline {args.baseline} used other settings; not comparing against it")
+    elif args.check:
+        # Checking against nothing would always pass
+        print(f"No baseline at {args.baseline}; store one with --save-baseline first")
+        raise SystemExit(1)
+
+    results, rows, problems = {}, [], []
+    for duration in args.durations:
+        video_path = generate_speech_video(duration)
+        if "emotions" in args.stages:
+            prepare_transcript(video_path, settings)
+        for stage in args.stages:
+            # *** Debugging Message *** #
+            print(f"Benchmarking {stage} On {duration}s Of Media...")
+
+            key = f"{stage}/{duration}s"
+            result = results[key] = measure(stage, video_path, duration, settings)
+            if "error" in result:
+                problems.append(f"{key} failed")
+                rows.append({"run": key, "seconds": "failed", "x realtime": "-",
+                             "peak RSS MB": "-", "baseline s": "-", "change": ""})
+                print(result["error"])
+                continue
+
+            previous = baseline.get(key)
+            change = ""
+            if args.check and (previous is None or "error" in previous):
+                problems.append(f"{key} has no baseline")
+            if previous is not None and "error" not in previous:
+                change = f"{result['seconds'] - previous['seconds']:+.1f}s"
+                regressed = regressions(result, previous)
+                if regressed:
+                    problems.append(f"{key} regressed ({', '.join(regressed)})")
+                    change += " REGRESSED"
+            rows.append({
+                "run": key, "seconds": f"{result['seconds']:.2f}",
+                "x realtime": f"{result['realtime']:.1f}",
+                "peak RSS MB": f"{max(result['peak_rss_mb'] or 0, result['child_peak_rss_mb'] or 0):.0f}",
+                "baseline s": f"{previous['seconds']:.2f}" if previous and "error" not in previous else "-",
+                "change": change})
+
+    print_table(rows, ["run", "seconds", "x realtime", "peak RSS MB", "baseline s", "change"])
+
+    # Keep the settings with the numbers, so a baseline is only compared
+    # with runs that did the same work
+    report = {"settings": settings, "python": sys.version.split()[0], "results": results}
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.check and problems:
+        print(f"\nEnd-to-end benchmark problems: {'; '.join(problems)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import cv2
+import numpy as np
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from Benchmarks.Common import generate_test_video, time_call, print_table
+from Components.FaceTracking import track_faces
+
+# ----------------------------------------------------------------------------
+# The previous approach: random-access get_frame() plus a full-resolution
+# Haar cascade on every sampled frame. Returns the number of frames analyzed.
+# ----------------------------------------------------------------------------
+
+
+def sample_with_get_frame(video_path, start_time, duration):
+    face_cascade = cv2.CascadeClassifier(
+        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    with VideoFileClip(video_path) as video:
+        subclip = video.subclip(start_time, start_time + duration)
+        count = int(subclip.duration * subclip.fps)
+        for t in np.linspace(0, subclip.duration, num=count, endpoint=False):
+            gray = cv2.cvtColor(subclip.get_frame(t), cv2.COLOR_BGR2GRAY)
+            face_cascade.detectMultiScale(
+                gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+    return count
+
+# ----------------------------------------------------------------------------
+# Compare frames analyzed per second for the old and new face tracking.
+# ----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark face tracking throughput.")
+    parser.add_argument("--video", help="Video to use (default: generated)")
+    parser.add_argument("--start", type=float, default=0.0)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--strides", type=int, nargs="+", default=[1, 5, 10])
+    args = parser.parse_args()
+
+    video_path = args.video or generate_test_video(
+        int(args.start + args.duration) + 1, 1920, 1080)
+
+    rows = []
+    seconds, frames = time_call(
+        lambda: sample_with_get_frame(video_path, args.start, args.duration))
+    rows.append({"method": "get_frame + full-res (old)", "frames": frames,
+                 "seconds": f"{seconds:.2f}", "frames/sec": f"{frames / seconds:.1f}"})
+
+    for stride in args.strides:
+        seconds, (centers, _) = time_call(
+            lambda: track_faces(video_path, args.start, args.duration, stride=stride))
+        rows.append({"method": f"ffmpeg pipe, stride {stride}", "frames": len(centers),
+                     "seconds": f"{seconds:.2f}", "frames/sec": f"{len(centers) / seconds:.1f}"})
+
+    print_table(rows, ["method", "frames", "seconds", "frames/sec"])
+
+
+if __name__ == "__main__":
+    main()
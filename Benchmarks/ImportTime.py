@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from Benchmarks.Common import print_table
+
+# Modules whose import time gates a Streamlit (re)start or a batch run
+TARGETS = ["streamlit", "Components.UserInterface", "Components.Pipeline", "cli"]
+
+# Stored results to compare against
+BASELINE_PATH = "Benchmarks/baselines/import_time.json"
+
+# A target regresses when it is this much slower than its baseline (fraction)
+# and by at least this many milliseconds (to ignore noise on fast imports)
+TOLERANCE = 0.2
+MIN_REGRESSION_MS = 50
+
+# ----------------------------------------------------------------------------
+# Import a module in a fresh interpreter with -X importtime and return the
+# cumulative microseconds of every module it pulled in.
+# ----------------------------------------------------------------------------
+
+
+def measure(module):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()[-2000:]}")
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+# ----------------------------------------------------------------------------
+# Fastest of N cold imports, in milliseconds, plus the slowest dependencies.
+# ----------------------------------------------------------------------------
+
+
+def best_of(module, repeat):
+    runs = [measure(module) for _ in range(repeat)]
+    best = min(runs, key=lambda times: times.get(module, 0))
+    return best.get(module, 0) / 1000, best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark cold import time and check it against a baseline.")
+    parser.add_argument("--targets", nargs="+", default=TARGETS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10,
+                        help="show the slowest imports pulled in by the targets")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--check", action="store_true",
+                        help="exit non-zero if a target regressed against the baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    elif args.check:
+        # Checking against nothing would always pass
+        print(f"No baseline at {args.baseline}; store one with --save-baseline first")
+        raise SystemExit(1)
+
+    results, dependencies, regressions = {}, {}, []
+    rows = []
+    for target in args.targets:
+        milliseconds, times = best_of(target, args.repeat)
+        results[target] = milliseconds
+        for name, cumulative in times.items():
+            dependencies[name] = max(dependencies.get(name, 0), cumulative / 1000)
+
+        previous = baseline.get(target)
+        change = ""
+        if args.check and previous is None:
+            regressions.append(f"{target} (no baseline)")
+        if previous is not None:
+            change = f"{milliseconds - previous:+.0f} ms"
+            if milliseconds > previous * (1 + TOLERANCE) and \
+                    milliseconds - previous >= MIN_REGRESSION_MS:
+                regressions.append(target)
+                change += " REGRESSED"
+        rows.append({"target": target, "import ms": f"{milliseconds:.0f}",
+                     "baseline ms": f"{previous:.0f}" if previous is not None else "-",
+                     "change": change})
+
+    print_table(rows, ["target", "import ms", "baseline ms", "change"])
+
+    # Where the time goes (top-level packages only, so nothing is counted twice)
+    print()
+    top = sorted(((ms, name) for name, ms in dependencies.items() if "." not in name),
+                 reverse=True)[:args.top]
+    print_table([{"module": name, "cumulative ms": f"{ms:.0f}"} for ms, name in top],
+                ["module", "cumulative ms"])
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.check and regressions:
+        print(f"\nImport time check failed for: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
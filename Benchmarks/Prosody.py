@@ -0,0 +1,60 @@
+import argparse
+import numpy as np
+from Benchmarks.Common import time_call, print_table
+from Components.Prosody import analyze_prosody, segment_features, prosody_scores, SAMPLE_RATE
+
+# ----------------------------------------------------------------------------
+# Build a deterministic speech-like waveform: a pitch-gliding voice whose
+# loudness comes and goes, with quiet gaps and bursts of noise (applause).
+# ----------------------------------------------------------------------------
+
+
+def synthetic_audio(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    audio = np.empty(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    block = 60 * SAMPLE_RATE
+    phase = 0.0
+    for first in range(0, len(audio), block):
+        t = np.arange(min(block, len(audio) - first), dtype=np.float64) / SAMPLE_RATE
+        pitch = 140.0 + 40.0 * np.sin(2 * np.pi * 0.3 * t)
+        voice = np.sin(phase + 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE)
+        phase = float(2 * np.pi * np.sum(pitch) / SAMPLE_RATE + phase)
+        envelope = 0.3 * (np.sin(2 * np.pi * 0.5 * t) > -0.3)
+        noise = rng.standard_normal(len(t)) * 0.2 * (np.sin(2 * np.pi * 0.02 * t) > 0.9)
+        audio[first:first + len(t)] = voice * envelope + noise
+    return audio
+
+# ----------------------------------------------------------------------------
+# Time frame analysis and per-segment scoring for an hour of audio.
+# ----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark prosody feature extraction.")
+    parser.add_argument("--seconds", type=float, default=3600.0)
+    parser.add_argument("--segment-seconds", type=float, default=4.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    audio = synthetic_audio(args.seconds)
+    starts = np.arange(0.0, args.seconds, args.segment_seconds)
+    ends = starts + args.segment_seconds * 0.9
+    word_counts = np.full(len(starts), 10)
+
+    frame_seconds, (loudness, pitch) = time_call(lambda: analyze_prosody(audio), args.repeat)
+    segment_seconds, scores = time_call(lambda: prosody_scores(
+        segment_features(loudness, pitch, starts, ends, word_counts)), args.repeat)
+
+    print_table([
+        {"step": "frame features", "items": f"{len(loudness)} frames",
+         "seconds": f"{frame_seconds:.3f}",
+         "audio x realtime": f"{args.seconds / frame_seconds:.0f}"},
+        {"step": "segment scores", "items": f"{len(scores)} segments",
+         "seconds": f"{segment_seconds:.3f}", "audio x realtime": "-"},
+    ], ["step", "items", "seconds", "audio x realtime"])
+    print(f"Voiced frames: {np.mean(~np.isnan(pitch)) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
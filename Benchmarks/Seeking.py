@@ -0,0 +1,69 @@
+import argparse
+import ffmpeg
+from Benchmarks.Common import generate_test_video, time_call, print_table, MEDIA_DIR
+from Components.Seeking import scan_keyframes, keyframe_before, seek_input
+
+# ----------------------------------------------------------------------------
+# Encode a short clip from a range opened by the given function.
+# ----------------------------------------------------------------------------
+
+
+def extract(streams, output_path):
+    ffmpeg.output(*streams, output_path,
+                  **{'c:v': 'libx264', 'preset': 'ultrafast', 'c:a': 'aac'}
+                  ).overwrite_output().run(capture_stdout=True, capture_stderr=True)
+
+# ----------------------------------------------------------------------------
+# The previous behaviour: decode from the start of the file and drop frames
+# until the clip begins (what MoviePy's subclip amounts to).
+# ----------------------------------------------------------------------------
+
+
+def decode_from_start(video_path, start_time, duration):
+    source = ffmpeg.input(video_path)
+    return [source.video.trim(start=start_time, duration=duration).setpts('PTS-STARTPTS'),
+            source.audio.filter('atrim', start=start_time, duration=duration)
+            .filter('asetpts', 'PTS-STARTPTS')]
+
+# ----------------------------------------------------------------------------
+# Compare clip extraction time at several positions in a long source.
+# ----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark clip extraction time against clip position.")
+    parser.add_argument("--video", help="Video to use (default: generated)")
+    parser.add_argument("--source-duration", type=int, default=1800)
+    parser.add_argument("--clip-duration", type=float, default=5.0)
+    parser.add_argument("--positions", type=float, nargs="+", default=[0.0, 0.25, 0.5, 0.9])
+    args = parser.parse_args()
+
+    video_path = args.video or generate_test_video(args.source_duration, 640, 360)
+    output_path = f"{MEDIA_DIR}/seek_clip.mp4"
+
+    seconds, keyframes = time_call(lambda: scan_keyframes(video_path))
+    print(f"Keyframe index: {len(keyframes)} keyframes in {seconds:.2f}s")
+
+    source_duration = float(ffmpeg.probe(video_path)["format"]["duration"])
+    rows = []
+    for position in args.positions:
+        start = min(position * source_duration, source_duration - args.clip_duration - 1)
+        keyframe = keyframe_before(keyframes, start)
+
+        old, _ = time_call(lambda: extract(
+            decode_from_start(video_path, start, args.clip_duration), output_path))
+        plain, _ = time_call(lambda: extract(
+            seek_input(video_path, start, args.clip_duration), output_path))
+        indexed, _ = time_call(lambda: extract(
+            seek_input(video_path, start, args.clip_duration, keyframe), output_path))
+        rows.append({"clip start": f"{start:.0f}s",
+                     "decode from start": f"{old:.2f}s",
+                     "input seek": f"{plain:.2f}s",
+                     "keyframe seek": f"{indexed:.2f}s"})
+
+    print_table(rows, ["clip start", "decode from start", "input seek", "keyframe seek"])
+
+
+if __name__ == "__main__":
+    main()
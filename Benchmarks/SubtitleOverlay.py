@@ -0,0 +1,90 @@
+import argparse
+import textwrap
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+from moviepy.video.VideoClip import ImageClip
+from Benchmarks.Common import generate_test_video, time_call, print_table
+from Components.Subtitles import SubtitleOverlay, load_font, find_font_path, FONT_SIZE
+
+# ----------------------------------------------------------------------------
+# The previous approach: reload the font and draw the text 25 times per
+# subtitle onto a full-width image, then let CompositeVideoClip blend one
+# ImageClip per subtitle into every frame.
+# ----------------------------------------------------------------------------
+
+
+def build_composite(video, subtitles):
+    clips = []
+    for start, end, text in subtitles:
+        text = "\n".join(textwrap.wrap(text, width=40)[:3])
+        img = Image.new('RGBA', (video.w, 125), (0, 0, 0, 128))
+        d = ImageDraw.Draw(img)
+        font_path = find_font_path()
+        font = ImageFont.truetype(font_path, FONT_SIZE) if font_path else ImageFont.load_default()
+        bbox = d.multiline_textbbox((0, 0), text, font=font, spacing=4)
+        x = (video.w - (bbox[2] - bbox[0])) // 2
+        y = (125 - (bbox[3] - bbox[1])) // 2
+        for dx in range(-2, 3):
+            for dy in range(-2, 3):
+                if dx or dy:
+                    d.multiline_text((x + dx, y + dy), text, font=font, fill="black", spacing=4)
+        d.multiline_text((x, y), text, font=font, fill="white", spacing=4)
+        clips.append(ImageClip(np.array(img)).set_duration(end - start).set_start(start)
+                     .set_position(('center', int(video.h * 0.75 - 125 / 2))))
+    return CompositeVideoClip([video] + clips)
+
+# ----------------------------------------------------------------------------
+# Overlay throughput of the old composite and the new subtitle overlay.
+# ----------------------------------------------------------------------------
+
+
+def render_frames(get_frame, fps, frames):
+    for index in range(frames):
+        get_frame(index / fps)
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark subtitle overlay throughput.")
+    parser.add_argument("--video", help="Video to use (default: generated)")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--subtitle-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    video_path = args.video or generate_test_video(int(args.duration) + 1, 1080, 1920)
+
+    # Back-to-back subtitles, with a few repeated lines as in real speech
+    lines = ["So here's the thing nobody tells you about this",
+             "and that's exactly why it matters", "No, really.", "Wait for it..."]
+    subtitles = [(t, t + args.subtitle_seconds, lines[i % len(lines)])
+                 for i, t in enumerate(np.arange(0, args.duration, args.subtitle_seconds))]
+
+    rows = []
+    with VideoFileClip(video_path) as video:
+        frames = int(args.duration * video.fps)
+
+        # Decoding alone, so the overlay cost can be read off the difference
+        seconds, _ = time_call(lambda: render_frames(video.get_frame, video.fps, frames))
+        rows.append({"method": "decode only", "setup (s)": "0.00",
+                     "frames/sec": f"{frames / seconds:.1f}"})
+
+        setup, composite = time_call(lambda: build_composite(video, subtitles))
+        seconds, _ = time_call(lambda: render_frames(composite.get_frame, video.fps, frames))
+        rows.append({"method": "ImageClip composite (old)", "setup (s)": f"{setup:.2f}",
+                     "frames/sec": f"{frames / seconds:.1f}"})
+
+        setup, overlay = time_call(lambda: SubtitleOverlay(
+            subtitles, video.w, video.h, load_font(find_font_path())))
+        seconds, _ = time_call(lambda: render_frames(
+            lambda t: overlay.apply(video.get_frame(t), t), video.fps, frames))
+        rows.append({"method": "SubtitleOverlay", "setup (s)": f"{setup:.2f}",
+                     "frames/sec": f"{frames / seconds:.1f}"})
+
+    print_table(rows, ["method", "setup (s)", "frames/sec"])
+
+
+if __name__ == "__main__":
+    main()
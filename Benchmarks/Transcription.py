@@ -0,0 +1,65 @@
+import argparse
+import os
+import torch
+from Benchmarks.Common import time_call, print_table
+from Components.Edits import decode_audio
+from Components.Transcriptions import transcribe_audio, TRANSCRIPTION_PARAMS, CPU_TRANSCRIPTION_PARAMS
+
+# Configurations compared by default (label -> transcription parameters)
+CONFIGURATIONS = {
+    "default (beam 5, fp32)": TRANSCRIPTION_PARAMS,
+    "int8, beam 5": dict(TRANSCRIPTION_PARAMS, compute_type="int8"),
+    "int8, beam 1, VAD": dict(CPU_TRANSCRIPTION_PARAMS, shards=1),
+    "int8, beam 1, VAD, 4 shards": CPU_TRANSCRIPTION_PARAMS,
+}
+
+# Transcripts are written here and removed after each run
+TRANSCRIPT_PATH = "temp_files/benchmarks/transcript.npz"
+
+
+class _CPUOnly:
+    # Stand-in for torch that always reports no GPU
+    class cuda:
+        @staticmethod
+        def is_available():
+            return False
+
+# ----------------------------------------------------------------------------
+# Report the real-time factor of each transcription configuration on CPU.
+# ----------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark CPU transcription real-time factor.")
+    parser.add_argument("--video", required=True,
+                        help="Video or audio file with speech")
+    parser.add_argument("--gpu", action="store_true",
+                        help="Allow CUDA if it is available")
+    args = parser.parse_args()
+
+    audio = decode_audio(args.video)
+    audio_seconds = len(audio) / 16000
+    os.makedirs(os.path.dirname(TRANSCRIPT_PATH), exist_ok=True)
+
+    rows = []
+    for label, params in CONFIGURATIONS.items():
+        def run():
+            if os.path.exists(TRANSCRIPT_PATH):
+                os.remove(TRANSCRIPT_PATH)
+            return transcribe_audio(audio, TRANSCRIPT_PATH, None,
+                                    torch if args.gpu else _CPUOnly, params)
+
+        seconds, segments = time_call(run)
+        rows.append({"configuration": label,
+                     "seconds": f"{seconds:.1f}",
+                     "RTF": f"{seconds / audio_seconds:.3f}",
+                     "segments": len(segments)})
+
+    os.remove(TRANSCRIPT_PATH)
+    print(f"Audio: {audio_seconds:.0f}s")
+    print_table(rows, ["configuration", "seconds", "RTF", "segments"])
+
+
+if __name__ == "__main__":
+    main()
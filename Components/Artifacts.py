@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+# ----------------------------------------------------------------------------
+# Content-addressed artifact store for everything under temp_files/.
+#
+# An artifact's path is derived from the input hash, the stage name and the
+# stage parameters, so a lookup is a single os.path.exists() and changing a
+# model or parameter naturally misses the cache instead of reusing stale data.
+# ----------------------------------------------------------------------------
+
+# Directory that holds every cached artifact
+ARTIFACT_DIR = "temp_files"
+
+# Bump when the on-disk layout of an artifact changes
+FORMAT_VERSION = 1
+
+# Size budget for temp_files/ (override with SHORTSAI_CACHE_MAX_MB)
+CACHE_MAX_BYTES = int(os.environ.get(
+    "SHORTSAI_CACHE_MAX_MB", "20480")) * 1024 * 1024
+
+# ----------------------------------------------------------------------------
+# Build the path of an artifact from its input hash, stage and parameters.
+# ----------------------------------------------------------------------------
+
+
+def artifact_path(file_hash, stage, params=None, ext="npz"):
+    key = json.dumps({"version": FORMAT_VERSION, "stage": stage,
+                      "params": params or {}}, sort_keys=True)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return f"{ARTIFACT_DIR}/{file_hash}_{stage}_{digest}.{ext}"
+
+# ----------------------------------------------------------------------------
+# Atomically write a set of NumPy arrays to an .npz artifact.
+# ----------------------------------------------------------------------------
+
+
+def save_arrays(path, **arrays):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    # Write next to the target and rename, so readers never see a partial file
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+# ----------------------------------------------------------------------------
+# Load the arrays of an .npz artifact and mark it as recently used.
+# ----------------------------------------------------------------------------
+
+
+def load_arrays(path):
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+
+    # The modification time doubles as the LRU clock for eviction
+    os.utime(path)
+    return arrays
+
+# ----------------------------------------------------------------------------
+# Pack a list of strings into one UTF-8 byte blob plus end offsets.
+# ----------------------------------------------------------------------------
+
+
+def pack_strings(strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.cumsum([len(e) for e in encoded], dtype=np.int64)
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+# ----------------------------------------------------------------------------
+# Unpack strings written by pack_strings.
+# ----------------------------------------------------------------------------
+
+
+def unpack_strings(blob, offsets):
+    data = blob.tobytes()
+    starts = np.concatenate(([0], offsets[:-1])) if len(offsets) else offsets
+    return [data[a:b].decode("utf-8") for a, b in zip(starts.tolist(), offsets.tolist())]
+
+# ----------------------------------------------------------------------------
+# Evict the least recently used files until temp_files/ fits the budget.
+# ----------------------------------------------------------------------------
+
+
+def evict_artifacts(max_bytes=CACHE_MAX_BYTES, directory=ARTIFACT_DIR, keep=()):
+    if not os.path.isdir(directory):
+        return []
+
+    # Collect cached files, skipping in-progress writes and anything in use
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and not entry.name.endswith(".tmp") and entry.path not in keep:
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    evicted = []
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        evicted.append(path)
+
+    if evicted:
+        # *** Debugging Message *** #
+        print(f"Evicted {len(evicted)} Cached Artifacts From {directory}")
+
+    return evicted
@@ -1,7 +1,17 @@
-from moviepy.video.io.VideoFileClip import VideoFileClip
-import streamlit as st
-import cv2
+import os
 import numpy as np
+import ffmpeg
+from Components.Helpers import probe_video
+from Components.FaceTracking import track_faces
+from Components.Reframing import compute_crop_path, detect_track_cuts, write_sendcmd
+from Components.Seeking import seek_input
+from Components.LazyImports import lazy_import
+
+# Only used to report on the legacy crop path
+st = lazy_import("streamlit")
+
+# Whisper works on 16 kHz mono audio, so decode straight to that format
+AUDIO_SAMPLE_RATE = 16000
 
 # ----------------------------------------------------------------------------
 # Extract audio from a video file
@@ -11,14 +21,14 @@ import numpy as np
 def extractAudio(video_path, audio_path):
     try:  # Try to execute the following code block
 
-        # Create a VideoFileClip object from the given video path
-        video_clip = VideoFileClip(video_path)
-
-        # Extract the audio from the video clip and save it to the specified audio path
-        video_clip.audio.write_audiofile(audio_path)
-
-        # Close the video clip to release resources
-        video_clip.close()
+        # Let ffmpeg skip the video stream and write 16 kHz mono PCM directly
+        ffmpeg.input(video_path).output(
+            audio_path,
+            vn=None,
+            ac=1,
+            ar=AUDIO_SAMPLE_RATE,
+            acodec='pcm_s16le'
+        ).overwrite_output().run(capture_stdout=True, capture_stderr=True)
 
         # *** Debugging Message *** #
         print(f"Audio Extracted To: {audio_path}")
@@ -27,75 +37,201 @@ def extractAudio(video_path, audio_path):
         return audio_path
 
     # If an exception occurs during the try block, execute this code block
-    except Exception as e:
+    except ffmpeg.Error as e:
         # *** Debugging Message *** #
-        print(f"An Error Occurred While Extracting Audio: {e}")
-
-        # Check if the video_clip variable exists in the local scope
-        if 'video_clip' in locals():
-            # If it exists, close the video clip to release resources
-            video_clip.close()
+        print(
+            f"An Error Occurred While Extracting Audio: {e.stderr.decode('utf-8', 'replace') if e.stderr else e}")
 
         # Return None to indicate that the audio extraction failed
         return None
 
+# ----------------------------------------------------------------------------
+# Decode the audio of a video file into a NumPy array (no WAV on disk)
+# ----------------------------------------------------------------------------
+
+
+def decode_audio(video_path, sample_rate=AUDIO_SAMPLE_RATE):
+    try:
+        # Pipe raw 16-bit mono PCM out of ffmpeg, skipping the video stream
+        out, _ = ffmpeg.input(video_path).output(
+            'pipe:',
+            vn=None,
+            ac=1,
+            ar=sample_rate,
+            format='s16le',
+            acodec='pcm_s16le'
+        ).run(capture_stdout=True, capture_stderr=True)
+
+    except ffmpeg.Error as e:
+        # *** Debugging Message *** #
+        print(
+            f"An Error Occurred While Decoding Audio: {e.stderr.decode('utf-8', 'replace') if e.stderr else e}")
+
+        # Return None to indicate that the audio decoding failed
+        return None
+
+    # Convert to the float32 [-1, 1] waveform faster-whisper expects
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+# Output dimensions of a rendered short (portrait: 1080x1920)
+OUTPUT_WIDTH, OUTPUT_HEIGHT = 1080, 1920
+
+# Longest clip we render, in seconds
+MAX_CLIP_SECONDS = 59
+
+# Named x264 encode settings. "draft" is for quick looks, "publish" spends
+# extra encode time on a smaller, cleaner file, and "proxy" is a low-res
+# preview that renders in a fraction of the time of the full encode.
+ENCODE_PROFILES = {
+    "draft": {"preset": "ultrafast", "crf": 28, "size": (OUTPUT_WIDTH, OUTPUT_HEIGHT),
+              "audio_bitrate": "128k"},
+    "standard": {"preset": "medium", "crf": 21, "size": (OUTPUT_WIDTH, OUTPUT_HEIGHT),
+                 "audio_bitrate": "160k"},
+    "publish": {"preset": "slow", "crf": 18, "size": (OUTPUT_WIDTH, OUTPUT_HEIGHT),
+                "audio_bitrate": "192k"},
+    "proxy": {"preset": "ultrafast", "crf": 30, "size": (360, 640),
+              "audio_bitrate": "64k"},
+}
+
+# Profile used when a job doesn't pick one
+DEFAULT_ENCODE_PROFILE = "standard"
+
+# ----------------------------------------------------------------------------
+# x264 threads per encode when several encodes share the machine.
+#
+# x264 sizes its thread pool for the whole machine, so N parallel renders
+# would each start ~1.5x cores worth of threads and thrash. Split the cores
+# between the workers instead.
+# ----------------------------------------------------------------------------
+
+
+def encode_threads(workers=1):
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+# ----------------------------------------------------------------------------
+# ffmpeg output options for an encode profile.
+# ----------------------------------------------------------------------------
+
+
+def encoder_options(profile=DEFAULT_ENCODE_PROFILE, threads=0):
+    settings = ENCODE_PROFILES[profile]
+    options = {
+        'c:v': 'libx264',
+        'preset': settings["preset"],
+        'crf': settings["crf"],
+        'pix_fmt': 'yuv420p',
+        'c:a': 'aac',
+        'b:a': settings["audio_bitrate"],
+        # Let players start before the whole file has downloaded
+        'movflags': '+faststart',
+    }
+
+    # 0 leaves x264 to pick its own thread count
+    if threads:
+        options['threads'] = threads
+    return options
 
 # ----------------------------------------------------------------------------
 # Crop a video file
 # ----------------------------------------------------------------------------
-def crop_video(input_file, output_file, start_time, end_time):
-    # Open the input video file as a VideoFileClip object using a context manager
-    with VideoFileClip(input_file) as video:
-        # Create a subclip of the video from the start time to the end time
-        cropped_video = video.subclip(start_time, end_time)
+def crop_video(input_file, output_file, start_time, end_time, profile=DEFAULT_ENCODE_PROFILE,
+               keyframe=None):
+    # Seek on the input side instead of decoding everything before the clip
+    video, audio = seek_input(input_file, start_time, end_time - start_time, keyframe)
+    streams = [video, audio] if probe_video(input_file)["has_audio"] else [video]
+
+    # Write the cropped video to the specified output file using the libx264 codec
+    ffmpeg.output(*streams, output_file, **encoder_options(profile)
+                  ).overwrite_output().run(capture_stdout=True, capture_stderr=True)
+
+
+# ----------------------------------------------------------------------------
+# Find a per-frame 9:16 crop path that keeps the speaker's face in frame
+# ----------------------------------------------------------------------------
+def find_crop_path(video_path, start_time, end_time, cut_times=(), keyframe=None):
+    info = probe_video(video_path)
+    width, height, fps = info["width"], info["height"], info["fps"]
+    duration = min(end_time, start_time + MAX_CLIP_SECONDS) - start_time
+
+    # x264 needs even dimensions, and the crop can't be wider than the video
+    crop_width = min(width, int(height * 9 / 16)) // 2 * 2
+
+    # Scene cuts inside the clip, as frame indices relative to its start
+    cut_times = np.asarray(cut_times, dtype=np.float64)
+    inside = cut_times[(cut_times > start_time) & (cut_times < start_time + duration)]
+    cut_frames = np.rint((inside - start_time) * fps).astype(np.int64)
+
+    # Track the face over the whole clip (restarting at every cut) and smooth
+    # it into a crop offset per frame, shot by shot
+    centers, fps = track_faces(
+        video_path, start_time, duration, cut_frames=cut_frames, keyframe=keyframe)
+    cuts = np.union1d(cut_frames, detect_track_cuts(centers, width))
+    crop_path = compute_crop_path(centers, fps, width, crop_width, cuts=cuts)
+
+    # Without any frames, fall back to the middle of the video
+    if len(crop_path) == 0:
+        crop_path = np.array([(width - crop_width) // 2], dtype=np.int32)
+
+    return crop_path, crop_width, fps
+
+
+# ----------------------------------------------------------------------------
+# Render a short in a single ffmpeg encode: seek, crop, scale and (optionally)
+# burn subtitles in one filter graph, with no per-frame Python work
+# ----------------------------------------------------------------------------
+def render_short(video_path, output_path, start_time, end_time, crop_path, crop_width, fps,
+                 srt_path=None, profile=DEFAULT_ENCODE_PROFILE, threads=0, keyframe=None):
+    info = probe_video(video_path)
+    duration = min(end_time, start_time + MAX_CLIP_SECONDS) - start_time
+
+    # Seek on the input side (via the nearest keyframe when we know it) so
+    # timestamps (and the SRT) start at zero
+    video, audio = seek_input(video_path, start_time, duration, keyframe)
+
+    # A moving crop is driven by sendcmd, which updates the crop offset at the
+    # frames where it changes, so ffmpeg applies the path without extra frames
+    command_path = None
+    if len(crop_path) > 1 and np.any(crop_path != crop_path[0]):
+        command_path = write_sendcmd(crop_path, fps, f"{output_path}.cmd")
+        video = video.filter('sendcmd', f=command_path.replace("\\", "/"))
+
+    video = video.crop(int(crop_path[0]), 0, crop_width, info["height"]).filter(
+        'scale', *ENCODE_PROFILES[profile]["size"])
+    if srt_path:
+        # ASS captions carry their own styling; SRT gets the Impact font
+        style = {'force_style': 'FontName=Impact'} if srt_path.endswith(".srt") else {}
+        video = video.filter('subtitles', srt_path.replace("\\", "/"), **style)
+
+    streams = [video, audio] if info["has_audio"] else [video]
+    try:
+        ffmpeg.output(
+            *streams, output_path, **encoder_options(profile, threads)
+        ).overwrite_output().run(capture_stdout=True, capture_stderr=True)
+    except ffmpeg.Error as e:
+        error_message = e.stderr.decode(
+            'utf-8') if e.stderr else "No stderr output."
+        print("FFmpeg error details:", error_message)
+        raise
+    finally:
+        if command_path and os.path.exists(command_path):
+            os.remove(command_path)
 
-        # Write the cropped video to the specified output file using the libx264 codec
-        cropped_video.write_videofile(output_file, codec='libx264')
+    # *** Debugging Message *** #
+    print(f"Rendered Short ({profile}) To: {output_path}")
 
 
 # ----------------------------------------------------------------------------
 # Detect a face in a video and crop the video around the face
 # ----------------------------------------------------------------------------
-def detect_face_and_crop(video_path, output_path, start_time, end_time):
+def detect_face_and_crop(video_path, output_path, start_time, end_time, cut_times=(),
+                         profile=DEFAULT_ENCODE_PROFILE, keyframe=None):
     try:
-        with VideoFileClip(video_path) as video:
-            subclip = video.subclip(start_time, min(end_time, start_time + 59))
-            width, height = subclip.size
-            target_aspect_ratio = 9 / 16
-            target_width = height * target_aspect_ratio
-
-            face_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-            face_positions = []
-            num_frames_to_analyze = min(
-                int(subclip.fps * 2), int(subclip.duration * subclip.fps))
-            for t in np.linspace(0, min(2, subclip.duration), num=num_frames_to_analyze):
-                frame = subclip.get_frame(t)
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = face_cascade.detectMultiScale(
-                    gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-                if len(faces) > 0:
-                    x, y, w, h_face = faces[0]
-                    center_x = x + w // 2
-                    face_positions.append(center_x)
-
-            avg_center_x = int(np.mean(face_positions)
-                               ) if face_positions else (width // 2)
-            left = max(0, avg_center_x - target_width // 2)
-            right = min(width, avg_center_x + target_width // 2)
-
-            # Set fixed output dimensions (portrait: 1080x1920)
-            output_width, output_height = 1080, 1920
-
-            def crop_frame(frame):
-                cropped = frame[:, int(left):int(right)]
-                return cv2.resize(cropped, (output_width, output_height))
-
-            cropped_subclip = subclip.fl_image(crop_frame)
-            cropped_subclip.write_videofile(
-                output_path, codec='libx264', bitrate="5000k", fps=subclip.fps)
-            cropped_subclip.close()
-            st.write(f"Cropped video saved to: {output_path}")
+        crop_path, crop_width, fps = find_crop_path(
+            video_path, start_time, end_time, cut_times, keyframe)
+        render_short(video_path, output_path, start_time,
+                     end_time, crop_path, crop_width, fps, profile=profile, keyframe=keyframe)
+        st.write(f"Cropped video saved to: {output_path}")
     except Exception as e:
         st.error(f"Face detection/cropping error: {e}")
         raise
@@ -0,0 +1,114 @@
+import numpy as np
+from Components.Helpers import probe_video
+from Components.LazyImports import lazy_import
+from Components.Seeking import seek_input
+
+# OpenCV is only needed when a clip is actually tracked
+cv2 = lazy_import("cv2")
+
+# Width frames are decoded at for analysis (height follows the aspect ratio)
+ANALYSIS_WIDTH = 320
+
+# Run the detector on every Nth frame and track in between
+DETECTION_STRIDE = 5
+
+# Smallest face the detector looks for, in source pixels
+MIN_FACE_SIZE = 30
+
+# A jump between detections wider than this fraction of the frame is a switch
+# to another subject (or shot), so it is not smoothed over by interpolation
+MAX_TRACK_JUMP = 0.2
+
+# ----------------------------------------------------------------------------
+# Decode grayscale frames sequentially through an ffmpeg pipe.
+# ----------------------------------------------------------------------------
+
+
+def read_gray_frames(video_path, start_time, duration, width, height, keyframe=None):
+    video, _ = seek_input(video_path, start_time, duration, keyframe)
+    process = (
+        video.output('pipe:', format='rawvideo', pix_fmt='gray', s=f"{width}x{height}")
+        .global_args('-loglevel', 'error')
+        .run_async(pipe_stdout=True)
+    )
+    frame_size = width * height
+    try:
+        while True:
+            data = process.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            yield np.frombuffer(data, np.uint8).reshape(height, width)
+    finally:
+        process.stdout.close()
+        process.wait()
+
+# ----------------------------------------------------------------------------
+# Track the speaker's horizontal face position over a range of the video.
+#
+# Returns one center x per decoded frame, in source pixels, plus the frame rate.
+# ----------------------------------------------------------------------------
+
+
+def track_faces(video_path, start_time, duration, analysis_width=ANALYSIS_WIDTH,
+                stride=DETECTION_STRIDE, cut_frames=(), keyframe=None):
+    info = probe_video(video_path)
+
+    # Decode at reduced resolution (even dimensions for the scaler)
+    scale = min(1.0, analysis_width / info["width"])
+    width = max(2, int(info["width"] * scale) // 2 * 2)
+    height = max(2, int(info["height"] * scale) // 2 * 2)
+    min_face = max(12, int(MIN_FACE_SIZE * scale))
+
+    face_cascade = cv2.CascadeClassifier(
+        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+    # Detect on every stride-th frame, keeping the largest face
+    detected_frames, detected_centers = [], []
+    frame_count = 0
+    cut_frames = set(int(c) for c in cut_frames)
+    since_detection = stride
+    for index, gray in enumerate(read_gray_frames(video_path, start_time, duration, width, height,
+                                                  keyframe)):
+        frame_count = index + 1
+
+        # Detect every stride-th frame, and straight away on a new shot
+        if index in cut_frames:
+            since_detection = stride
+        if since_detection < stride:
+            since_detection += 1
+            continue
+        since_detection = 1
+
+        faces = face_cascade.detectMultiScale(
+            gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_face, min_face))
+        if len(faces) > 0:
+            x, y, w, h_face = max(faces, key=lambda f: f[2] * f[3])
+            detected_frames.append(index)
+            detected_centers.append((x + w / 2) / scale)
+
+    # Without any detection, stay in the middle of the frame
+    if not detected_frames:
+        return np.full(frame_count, info["width"] / 2, dtype=np.float32), info["fps"]
+
+    # Track between detections by interpolating, holding the ends steady
+    frames = np.arange(frame_count)
+    centers = np.interp(frames, detected_frames, detected_centers)
+
+    # Where the subject jumps, hold the old position and switch in one step
+    detected_frames = np.asarray(detected_frames)
+    detected_centers = np.asarray(detected_centers)
+    jumps = np.flatnonzero(np.abs(np.diff(detected_centers))
+                           > MAX_TRACK_JUMP * info["width"])
+    for jump in jumps:
+        first, last = detected_frames[jump], detected_frames[jump + 1]
+        centers[first:last] = detected_centers[jump]
+
+    # Never carry the track across a shot boundary: hold each side's nearest
+    # detection up to the cut instead of interpolating through it
+    for cut in sorted(cut_frames):
+        after = np.searchsorted(detected_frames, cut)
+        if 0 < after < len(detected_frames):
+            centers[detected_frames[after - 1]:cut] = detected_centers[after - 1]
+            centers[cut:detected_frames[after]] = detected_centers[after]
+
+    return centers.astype(np.float32), info["fps"]
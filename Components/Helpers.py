@@ -1,76 +1,151 @@
 import hashlib
-import cv2
+import mmap
+import os
+import tempfile
+import ffmpeg
+import numpy as np
+from Components.Artifacts import save_arrays, load_arrays, pack_strings, unpack_strings
+from Components.LazyImports import lazy_import
+from Components.TranscriptIndex import TranscriptIndex
+
+# OpenCV is only needed by crop_frame
+cv2 = lazy_import("cv2")
+
+# Block size used when streaming files through a hash (8 MB)
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Number of blocks sampled by the fast fingerprint mode
+FINGERPRINT_SAMPLES = 16
+
+# Word timings of a segment that has none
+EMPTY_WORDS = (np.zeros(0, np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32))
 
 # ---------------------------------------------------------------
-# Compute MD5 hash of a file.
+# Compute the content hash of a file.
 # ---------------------------------------------------------------
 
 
-def get_file_hash(file_path):
+def get_file_hash(file_path, fast=False, block_size=HASH_BLOCK_SIZE):
+    # Huge inputs can use a sampled fingerprint instead of a full read
+    if fast:
+        return get_file_fingerprint(file_path, block_size=block_size)
+
     # Create an MD5 hash object
     hasher = hashlib.md5()
 
     # Open the file in binary read mode
     with open(file_path, 'rb') as f:
-        # Read the entire file into a buffer
-        buf = f.read()
-
-        # Update the hash object with the file's content
-        hasher.update(buf)
+        try:
+            # Memory-map the file so blocks are paged in by the OS, not copied
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, len(mapped), block_size):
+                        hasher.update(view[offset:offset + block_size])
+                finally:
+                    view.release()
+
+        except (ValueError, OSError):
+            # Empty files and some file systems can't be mapped; fall back to
+            # reading fixed-size blocks into one reusable buffer
+            f.seek(0)
+            buf = bytearray(block_size)
+            view = memoryview(buf)
+            while True:
+                read = f.readinto(buf)
+                if not read:
+                    break
+                hasher.update(view[:read])
 
     # Return the hexadecimal representation of the hash
     return hasher.hexdigest()
 
 # ---------------------------------------------------------------
-# Break the transcription segments into chunks.
+# Compute a fast fingerprint of a file (size plus sampled blocks).
 # ---------------------------------------------------------------
 
 
-def chunk_text_with_timestamps(transcription_segments, max_length=192):
-    # Initialize an empty list to store the chunks
-    chunks = []
+def get_file_fingerprint(file_path, samples=FINGERPRINT_SAMPLES, block_size=HASH_BLOCK_SIZE):
+    # BLAKE2 is faster than MD5 and keeps the digest the same length
+    hasher = hashlib.blake2b(digest_size=16)
 
-    # Initialize an empty list to store the current chunk
-    current_chunk = []
+    # Mix in the size so files with the same sampled blocks still differ
+    size = os.path.getsize(file_path)
+    hasher.update(size.to_bytes(8, "little"))
 
-    # Initialize the current length of the chunk to 0
-    current_length = 0
+    with open(file_path, 'rb') as f:
+        # Small files are cheap enough to hash completely
+        if size <= samples * block_size:
+            offsets = range(0, size, block_size)
+        else:
+            # Sample evenly spaced blocks, always including the first and last
+            step = (size - block_size) / (samples - 1)
+            offsets = [int(i * step) for i in range(samples)]
 
-    # Iterate over each transcription segment
-    for segment in transcription_segments:
-        # Get the start time of the segment
-        start_time = segment["timestamp"][0]
+        for offset in offsets:
+            f.seek(offset)
+            hasher.update(f.read(block_size))
 
-        # Get the end time of the segment
-        end_time = segment["timestamp"][1]
+    # Prefix the digest so fingerprints never collide with full hashes
+    return "fp" + hasher.hexdigest()
 
-        # Get the text of the segment
-        text = segment["text"]
+# ---------------------------------------------------------------
+# Copy an uploaded file to disk while hashing it in the same pass.
+# ---------------------------------------------------------------
 
-        # Check if adding the current segment exceeds the maximum length
-        if current_length + len(text.split()) > max_length:
 
-            # Append the current chunk to the list of chunks
-            chunks.append(current_chunk)
+def save_uploaded_file(uploaded_file, suffix=".mp4", block_size=HASH_BLOCK_SIZE):
+    # Same digest as get_file_hash so cached artifacts keep matching
+    hasher = hashlib.md5()
 
-            # Start a new chunk with the current segment
-            current_chunk = [(start_time, end_time, text)]
+    # Start from the beginning in case the upload was read before
+    uploaded_file.seek(0)
 
-            # Update the current length with the length of the current segment
-            current_length = len(text.split())
-        else:
-            # Add the current segment to the current chunk
-            current_chunk.append((start_time, end_time, text))
+    # Reuse one buffer for every block so memory stays bounded
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        while True:
+            read = uploaded_file.readinto(buf)
+            if not read:
+                break
+            hasher.update(view[:read])
+            temp_file.write(view[:read])
 
-            # Update the current length
-            current_length += len(text.split())
+    # Return the path of the file on disk and its hash
+    return temp_file.name, hasher.hexdigest()
+
+# ---------------------------------------------------------------
+# Read the dimensions, frame rate and streams of a video with ffprobe
+# ---------------------------------------------------------------
+
+
+def probe_video(video_path):
+    info = ffmpeg.probe(video_path)
+    video_stream = next(
+        s for s in info["streams"] if s["codec_type"] == "video")
+    num, den = video_stream.get("avg_frame_rate", "30/1").split("/")
+    return {
+        "width": int(video_stream["width"]),
+        "height": int(video_stream["height"]),
+        "fps": float(num) / float(den) if float(den) else 30.0,
+        "duration": float(info["format"].get("duration", 0.0)),
+        "start_time": float(info["format"].get("start_time", 0.0)),
+        "has_audio": any(s["codec_type"] == "audio" for s in info["streams"]),
+    }
+
+# ---------------------------------------------------------------
+# Break the transcription segments into chunks.
+# ---------------------------------------------------------------
 
-    # If there's a remaining chunk, append it to the list of chunks
-    if current_chunk:
-        chunks.append(current_chunk)
 
-    # Return the list of text chunks
-    return chunks
+def chunk_text_with_timestamps(transcription_segments, max_length=192):
+    # Each chunk holds whole segments up to max_length words; the chunk
+    # boundaries come from the index's word-count prefix sum
+    return [[(segment["timestamp"][0], segment["timestamp"][1], segment["text"])
+             for segment in chunk]
+            for chunk in TranscriptIndex(transcription_segments).chunks(max_length)]
 
 # ---------------------------------------------------------------
 # Crop a single video frame to a 9:16 aspect ratio.
@@ -86,40 +161,100 @@ def crop_frame(frame, left, right, target_width, width, height):
     return cv2.resize(cropped_frame, (1080, 1920))
 
 # ---------------------------------------------------------------
-# Load and parse transcription segments from a transcript file.
+# Pack a segment's word timings as three parallel arrays: start and
+# end times, and the end offset of each word in the segment's text
+# (the words are slices of the text, so no per-word strings).
 # ---------------------------------------------------------------
 
 
-def load_transcription_segments(transcript_path):
+def pack_words(starts, ends, pieces):
+    return (np.array(starts, dtype=np.float32), np.array(ends, dtype=np.float32),
+            np.cumsum([len(piece) for piece in pieces], dtype=np.int32))
+
+# ---------------------------------------------------------------
+# Yield (start, end, word) for every word of a segment. Segments
+# without word timings yield the whole segment as one "word".
+# ---------------------------------------------------------------
+
+
+def iter_words(segment):
+    if "words" not in segment:
+        yield segment["timestamp"][0], segment["timestamp"][1], segment["text"].strip()
+        return
+
+    starts, ends, offsets = segment["words"]
+    text, first = segment["text"], 0
+    for start, end, last in zip(starts.tolist(), ends.tolist(), offsets.tolist()):
+        yield start, end, text[first:last].strip()
+        first = last
+
+# ---------------------------------------------------------------
+# Write transcription segments to an artifact.
+# ---------------------------------------------------------------
 
-    # Initialize an empty list to store transcription segments
-    transcription_segments = []
 
-    # Open the transcript file in read mode
-    with open(transcript_path, 'r', encoding='utf-8') as f:
-        # Iterate over each line in the file
-        for line in f:
-            # Check if the line is not empty
-            if line.strip():
-                parts = line.strip().split(']')
-                if len(parts) == 2:
-                    timestamp, text = parts
-                    start_time, end_time = map(
-                        float, timestamp[1:].split(' - '))
-                    transcription_segments.append(
-                        {"timestamp": [start_time, end_time], "text": text})
-    return transcription_segments
+def save_transcription_segments(transcription_segments, transcript_path):
+    text_blob, text_offsets = pack_strings(
+        [segment["text"] for segment in transcription_segments])
+
+    # Word timings for every segment back to back, with each segment's end
+    # index into them (segments without words just contribute nothing)
+    words = [segment.get("words", EMPTY_WORDS) for segment in transcription_segments]
+    save_arrays(
+        transcript_path,
+        start=np.array([s["timestamp"][0] for s in transcription_segments], dtype=np.float64),
+        end=np.array([s["timestamp"][1] for s in transcription_segments], dtype=np.float64),
+        text_blob=text_blob,
+        text_offsets=text_offsets,
+        word_start=np.concatenate([w[0] for w in words] or [EMPTY_WORDS[0]]),
+        word_end=np.concatenate([w[1] for w in words] or [EMPTY_WORDS[1]]),
+        word_offsets=np.concatenate([w[2] for w in words] or [EMPTY_WORDS[2]]),
+        word_index=np.cumsum([len(w[0]) for w in words], dtype=np.int64)
+    )
 
 # ---------------------------------------------------------------
-# Write emotion analysis data to file.
+# Load transcription segments from an artifact.
+# ---------------------------------------------------------------
+
+
+def load_transcription_segments(transcript_path):
+    data = load_arrays(transcript_path)
+    texts = unpack_strings(data["text_blob"], data["text_offsets"])
+    segments = [{"timestamp": [start, end], "text": text}
+                for start, end, text in zip(data["start"].tolist(), data["end"].tolist(), texts)]
+
+    # Transcripts written before word timestamps simply have none
+    if "word_index" in data and len(data["word_start"]):
+        bounds = data["word_index"][:-1]
+        for segment, starts, ends, offsets in zip(
+                segments, np.split(data["word_start"], bounds), np.split(data["word_end"], bounds),
+                np.split(data["word_offsets"], bounds)):
+            if len(starts):
+                segment["words"] = (starts, ends, offsets)
+    return segments
+
+# ---------------------------------------------------------------
+# Write emotion analysis data to an artifact.
 # ---------------------------------------------------------------
 
 
 def save_emotion_analysis(emotions, file_path):
-    with open(file_path, 'w', encoding='utf-8') as f:
-        for emotion in emotions:
-            f.write(
-                f"{emotion['start']} - {emotion['end']} - {emotion['label']} - {emotion['score']} - {emotion['text']}\n")
+    # Store each label once and refer to it by index
+    labels, label_index = np.unique(
+        np.array([e["label"] for e in emotions], dtype=str), return_inverse=True)
+    label_blob, label_offsets = pack_strings(labels.tolist())
+    text_blob, text_offsets = pack_strings([e["text"] for e in emotions])
+    save_arrays(
+        file_path,
+        start=np.array([e["start"] for e in emotions], dtype=np.float64),
+        end=np.array([e["end"] for e in emotions], dtype=np.float64),
+        score=np.array([e["score"] for e in emotions], dtype=np.float32),
+        label_index=label_index.astype(np.int32),
+        label_blob=label_blob,
+        label_offsets=label_offsets,
+        text_blob=text_blob,
+        text_offsets=text_offsets
+    )
 
 # ---------------------------------------------------------------
 # Read previously saved emotion analysis results.
@@ -127,18 +262,13 @@ def save_emotion_analysis(emotions, file_path):
 
 
 def load_emotion_analysis(file_path):
-    emotions = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            start, end, label, score, text = line.strip().split(' - ')
-            emotions.append({
-                'start': float(start),
-                'end': float(end),
-                'label': label,
-                'score': float(score),
-                'text': text
-            })
-    return emotions
+    data = load_arrays(file_path)
+    labels = unpack_strings(data["label_blob"], data["label_offsets"])
+    texts = unpack_strings(data["text_blob"], data["text_offsets"])
+    return [{"start": start, "end": end, "label": labels[index], "score": score, "text": text}
+            for start, end, score, index, text in zip(
+                data["start"].tolist(), data["end"].tolist(), data["score"].tolist(),
+                data["label_index"].tolist(), texts)]
 
 # ---------------------------------------------------------------
 # Convert seconds (float) to SRT timestamp format (HH:MM:SS,ms).
@@ -151,3 +281,12 @@ def format_timestamp(seconds):
     secs = seconds % 60
     millis = int(round((secs - int(secs)) * 1000))
     return f"{hrs:02d}:{mins:02d}:{int(secs):02d},{millis:03d}"
+
+# ---------------------------------------------------------------
+# Convert seconds (float) to ASS timestamp format (H:MM:SS.cc).
+# ---------------------------------------------------------------
+
+
+def format_ass_timestamp(seconds):
+    centis = int(round(max(seconds, 0.0) * 100))
+    return f"{centis // 360000}:{centis // 6000 % 60:02d}:{centis // 100 % 60:02d}.{centis % 100:02d}"
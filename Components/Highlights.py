@@ -0,0 +1,284 @@
+import os
+import numpy as np
+from Components.Edits import find_crop_path, render_short, encode_threads, MAX_CLIP_SECONDS, \
+    DEFAULT_ENCODE_PROFILE
+from Components.Subtitles import write_captions, DEFAULT_CAPTION_STYLE
+from Components.SceneDetection import snap_to_cuts
+from Components.Seeking import keyframe_before
+from Components.TranscriptIndex import TranscriptIndex
+from Components.Pools import get_process_pool, LimitedPool
+
+# Size of the shared render worker pool (the most render workers a job may
+# ask for); each job keeps only its own number of clips encoding at once
+RENDER_POOL_WORKERS = max(2, os.cpu_count() or 1)
+
+# Emotion labels that count towards a highlight
+DRAMATIC_LABELS = ('anger', 'fear', 'sadness')
+
+# Smallest emotion score (prosody left out) a window needs before the
+# streaming scorer will commit to it ahead of the end. Almost every segment has
+# some prosody, so counting it would let ordinary talk clear the bar
+STREAMING_MIN_SCORE = 2.0
+
+# How much a segment's audio prosody score (0-1) counts next to its emotion
+# score, so shouting, laughter and applause register without dramatic words
+PROSODY_WEIGHT = 0.5
+
+# ----------------------------------------------------------------------------
+# Score a clip window starting at every segment.
+#
+# Each window's score is the sum of the combined scores (dramatic emotion plus
+# weighted prosody) of the segments that start inside it, taken from a prefix
+# sum.
+# ----------------------------------------------------------------------------
+
+
+def score_windows(emotions, clip_length=MAX_CLIP_SECONDS, labels=DRAMATIC_LABELS,
+                  prosody_weight=PROSODY_WEIGHT):
+    # Per-segment start times and scores (zero for non-dramatic labels), plus
+    # the prosody score where the audio features are known
+    starts = np.array([float(e['start']) for e in emotions])
+    scores = np.array([(float(e['score']) if e['label'] in labels else 0.0)
+                       + prosody_weight * e.get('prosody', 0.0)
+                       for e in emotions])
+
+    prefix = np.concatenate(([0.0], np.cumsum(scores)))
+    stops = np.searchsorted(starts, starts + clip_length, side='left')
+    return starts, prefix[stops] - prefix[:-1]
+
+# ----------------------------------------------------------------------------
+# Non-maximum suppression: take the best window, then drop every window that
+# would overlap it, until we have enough clips or run out of signal.
+#
+# Returns (window index, highlight) pairs.
+# ----------------------------------------------------------------------------
+
+
+def pick_windows(starts, window_scores, count, clip_length=MAX_CLIP_SECONDS, cut_times=(),
+                 min_score=0.0, eligible=None, taken=(), transcript=None):
+    remaining = window_scores.copy()
+
+    # Only consider eligible windows that don't overlap clips already taken
+    if eligible is not None:
+        remaining[~eligible] = -np.inf
+    for start in taken:
+        remaining[np.abs(starts - start) < clip_length] = -np.inf
+
+    picked = []
+    for _ in range(count):
+        if len(remaining) == 0:
+            break
+        best = int(np.argmax(remaining))
+        if remaining[best] <= min_score:
+            break
+        # Open and close the clip on shot boundaries where there's one nearby
+        start_time, end_time = snap_to_cuts(
+            float(starts[best]), float(starts[best] + clip_length), cut_times)
+
+        # ...and on sentence boundaries, so no clip opens or ends mid-sentence
+        if transcript is not None:
+            start_time, end_time = transcript.snap(start_time, end_time)
+        picked.append((best, {"start": start_time,
+                              "end": end_time,
+                              "score": float(window_scores[best])}))
+        remaining[np.abs(starts - starts[best]) < clip_length] = -np.inf
+
+    return picked
+
+# ----------------------------------------------------------------------------
+# Mark the windows that score at least as well as every window starting
+# within clip_length of them (ignoring windows that overlap clips already
+# taken, since those can never be picked).
+#
+# The neighbourhood of each window is a contiguous range of the sorted
+# starts, so all the range maxima come from one maximum.reduceat over the
+# interleaved range bounds.
+# ----------------------------------------------------------------------------
+
+
+def local_maxima(starts, window_scores, clip_length=MAX_CLIP_SECONDS, taken=()):
+    scores = window_scores.astype(np.float64)
+    for start in taken:
+        scores[np.abs(starts - start) < clip_length] = -np.inf
+
+    first = np.searchsorted(starts, starts - clip_length, side='right')
+    last = np.searchsorted(starts, starts + clip_length, side='left')
+
+    # A sentinel keeps every bound a valid index for reduceat
+    padded = np.append(scores, -np.inf)
+    bounds = np.column_stack((first, last)).ravel()
+    return scores >= np.maximum.reduceat(padded, bounds)[::2]
+
+# ----------------------------------------------------------------------------
+# Rank non-overlapping clip windows over the whole emotion timeline.
+# ----------------------------------------------------------------------------
+
+
+def select_highlights(emotions, top_n=3, clip_length=MAX_CLIP_SECONDS, labels=DRAMATIC_LABELS,
+                      cut_times=(), transcript=None):
+    if not emotions:
+        return []
+
+    starts, window_scores = score_windows(emotions, clip_length, labels)
+    return [highlight for _, highlight in
+            pick_windows(starts, window_scores, top_n, clip_length, cut_times,
+                         transcript=transcript)]
+
+
+class IncrementalHighlighter:
+    # Picks highlights while the transcript is still streaming in. A window is
+    # only committed once every window that could overlap it has been fully
+    # transcribed (so all their scores are final) and it beats all of them,
+    # so a later segment can never beat it.
+
+    def __init__(self, top_n=3, clip_length=MAX_CLIP_SECONDS, labels=DRAMATIC_LABELS,
+                 cut_times=(), min_score=STREAMING_MIN_SCORE, transcript=None):
+        self.top_n = top_n
+        self.clip_length = clip_length
+        self.labels = labels
+        self.cut_times = cut_times
+        self.min_score = min_score
+        self.transcript = transcript
+        self.emotions = []
+        self.taken = []
+        self.highlights = []
+
+    def add(self, emotions):
+        self.emotions.extend(emotions)
+        if not self.emotions or len(self.highlights) >= self.top_n:
+            return []
+
+        # Everything up to the end of the latest segment has been transcribed
+        transcribed_until = float(self.emotions[-1]['end'])
+        starts, window_scores = score_windows(
+            self.emotions, self.clip_length, self.labels)
+        settled = starts + 2 * self.clip_length <= transcribed_until
+        eligible = settled & local_maxima(starts, window_scores, self.clip_length, self.taken)
+
+        # Windows are ranked on the fused score, but only committed early on
+        # the strength of their emotions
+        _, emotion_scores = score_windows(
+            self.emotions, self.clip_length, self.labels, prosody_weight=0.0)
+        eligible &= emotion_scores > self.min_score
+
+        return self._take(pick_windows(
+            starts, window_scores, self.top_n - len(self.highlights), self.clip_length,
+            self.cut_times, eligible=eligible, taken=self.taken,
+            transcript=self.transcript), starts)
+
+    def finish(self):
+        # Fill the remaining slots from the complete timeline
+        if not self.emotions or len(self.highlights) >= self.top_n:
+            return []
+        starts, window_scores = score_windows(
+            self.emotions, self.clip_length, self.labels)
+        return self._take(pick_windows(
+            starts, window_scores, self.top_n - len(self.highlights), self.clip_length,
+            self.cut_times, taken=self.taken, transcript=self.transcript), starts)
+
+    def _take(self, picked, starts):
+        for index, highlight in picked:
+            self.taken.append(starts[index])
+            self.highlights.append(highlight)
+        return [highlight for _, highlight in picked]
+
+# ----------------------------------------------------------------------------
+# Build the output paths for a highlight (keyed by its window, not its rank,
+# so a clip is reused however many highlights are requested, and by its
+# encode profile and caption style so a draft never stands in for a publish
+# render).
+# ----------------------------------------------------------------------------
+
+
+def highlight_paths(file_hash, highlight, profile=DEFAULT_ENCODE_PROFILE,
+                    captions=DEFAULT_CAPTION_STYLE):
+    name = f"temp_files/{file_hash}_clip_{int(highlight['start'] * 1000)}_{int(highlight['end'] * 1000)}"
+    if profile != DEFAULT_ENCODE_PROFILE:
+        name = f"{name}_{profile}"
+
+    # Whole-segment captions are SRT; word groups and karaoke are ASS
+    if captions == "segments":
+        return f"{name}.mp4", f"{name}.srt"
+    return f"{name}_{captions}.mp4", f"{name}_{captions}.ass"
+
+# ----------------------------------------------------------------------------
+# Render one highlight: subtitles, crop window and a single-pass encode.
+# (Top-level so it can be sent to a worker process.)
+# ----------------------------------------------------------------------------
+
+
+def render_highlight(video_path, transcription_segments, highlight, output_path, caption_path,
+                     cut_times=(), profile=DEFAULT_ENCODE_PROFILE, threads=0,
+                     captions=DEFAULT_CAPTION_STYLE, keyframe=None):
+    start_time, end_time = highlight["start"], highlight["end"]
+
+    # Create captions relative to the start of the clip
+    write_captions(transcription_segments, start_time, end_time, caption_path, captions)
+
+    # Follow the speaker with a smoothed crop path and render in one encode
+    crop_path, crop_width, fps = find_crop_path(
+        video_path, start_time, end_time, cut_times, keyframe)
+    render_short(video_path, output_path, start_time,
+                 end_time, crop_path, crop_width, fps, caption_path, profile, threads, keyframe)
+    return output_path
+
+# ----------------------------------------------------------------------------
+# Queue one highlight on a process pool. Returns its output path and the
+# future rendering it (None if it was rendered by an earlier run).
+#
+# The transcript is a TranscriptIndex, so finding the clip's segments is a
+# bisect rather than a scan of the whole transcript per clip.
+# ----------------------------------------------------------------------------
+
+
+def submit_highlight(pool, video_path, transcript, highlight, file_hash, cut_times=(),
+                     profile=DEFAULT_ENCODE_PROFILE, threads=0, captions=DEFAULT_CAPTION_STYLE,
+                     keyframes=()):
+    output_path, caption_path = highlight_paths(file_hash, highlight, profile, captions)
+
+    # Skip clips that were rendered by an earlier run
+    if os.path.exists(output_path):
+        # *** Debugging Message *** #
+        print(f"Clip Already Exists Using: {output_path}")
+        return output_path, None
+
+    # Only send the segments and cuts this clip needs to the worker
+    segments = transcript.overlapping(highlight["start"], highlight["end"])
+    cuts = [t for t in cut_times if highlight["start"] < t < highlight["end"]]
+    keyframe = keyframe_before(keyframes, highlight["start"]) if len(keyframes) else None
+
+    # *** Debugging Message *** #
+    print(
+        f"Extracting Clip From {highlight['start']:.2f}s To {highlight['end']:.2f}s.")
+
+    return output_path, pool.submit(render_highlight, video_path, segments, highlight,
+                                    output_path, caption_path, cuts, profile, threads, captions,
+                                    keyframe)
+
+# ----------------------------------------------------------------------------
+# Render every highlight concurrently through the (long-lived) render pool.
+# ----------------------------------------------------------------------------
+
+
+def render_highlights(video_path, transcription_segments, highlights, file_hash, workers=2,
+                      cut_times=(), profile=DEFAULT_ENCODE_PROFILE, captions=DEFAULT_CAPTION_STYLE,
+                      keyframes=()):
+    # Share the cores between the parallel encodes
+    threads = encode_threads(workers)
+
+    # Index the transcript once for every clip
+    transcript = TranscriptIndex(transcription_segments)
+
+    pool = LimitedPool(get_process_pool("render", RENDER_POOL_WORKERS), workers)
+    submitted = [submit_highlight(pool, video_path, transcript, highlight,
+                                  file_hash, cut_times, profile, threads, captions,
+                                  keyframes)
+                 for highlight in highlights]
+
+    # Surface any worker error in the caller
+    for _, future in submitted:
+        if future is not None:
+            # *** Debugging Message *** #
+            print(f"Generated Clip With Subtitles At: {future.result()}")
+
+    return [output_path for output_path, _ in submitted]
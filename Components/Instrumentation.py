@@ -0,0 +1,193 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# ----------------------------------------------------------------------------
+# Per-stage timing and resource instrumentation.
+#
+# Every stage produces one JSON line in METRICS_PATH with its wall time, CPU
+# time, peak RSS and any throughput counters the stage filled in. Set
+# SHORTSAI_PROFILE=1 to also dump a cProfile file per stage.
+#
+# CPU time is process-wide (every thread, including the native intra-op
+# threads of torch, CTranslate2 and ONNX Runtime), so stages of concurrent
+# jobs share it. Peak RSS is sampled while the stage runs, since ru_maxrss
+# only reports the lifetime high-water mark of the (long-lived) process.
+# ----------------------------------------------------------------------------
+
+# Kept outside temp_files/ so artifact eviction never removes it
+METRICS_PATH = "logs/metrics.jsonl"
+
+# Where per-stage cProfile dumps go when profiling is enabled
+PROFILE_DIR = "logs/profiles"
+
+# Opt-in profiling hook
+PROFILE_ENABLED = os.environ.get("SHORTSAI_PROFILE") == "1"
+
+# How often the resident set size is sampled while a stage runs (seconds)
+RSS_SAMPLE_SECONDS = 0.05
+
+# Page size used to read /proc/self/statm (Linux only)
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Serializes appends from concurrent jobs
+_write_lock = threading.Lock()
+
+# ----------------------------------------------------------------------------
+# Lifetime peak resident set size in MB for this process and its reaped
+# children.
+# ----------------------------------------------------------------------------
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None, None
+
+    # ru_maxrss is in kilobytes on Linux but bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+# ----------------------------------------------------------------------------
+# Current resident set size in MB (None where /proc isn't available).
+# ----------------------------------------------------------------------------
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+# ----------------------------------------------------------------------------
+# CPU seconds used so far by reaped child processes (ffmpeg, worker pools).
+# ----------------------------------------------------------------------------
+
+
+def children_cpu_seconds():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class RssSampler:
+    # Tracks the highest resident set size seen while a stage runs, by
+    # sampling on a daemon thread. Where the RSS can't be read it reports
+    # None rather than the process's lifetime peak.
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._stopped = threading.Event()
+        self._thread = None
+        if self.peak is not None:
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None:
+            self.peak = max(self.peak, rss)
+
+    def stop(self):
+        if self._thread is None:
+            return None
+        self._stopped.set()
+        self._thread.join()
+        self._sample()
+        return self.peak
+
+
+class StageRecorder:
+    def __init__(self, job_key, path=METRICS_PATH, profile=PROFILE_ENABLED):
+        self.job_key = job_key
+        self.path = path
+        self.profile = profile
+        self.records = []
+
+    @contextmanager
+    def stage(self, name):
+        record = {"type": "stage", "job": self.job_key, "stage": name}
+
+        # Name the thread after the stage so py-spy dumps show where it is
+        thread = threading.current_thread()
+        thread_name = thread.name
+        thread.name = f"{thread_name}:{name}"
+
+        profiler = self._start_profiler()
+        wall, cpu, child_cpu = time.perf_counter(), time.process_time(), children_cpu_seconds()
+        sampler = RssSampler()
+        try:
+            yield record
+            record["status"] = "ok"
+        except BaseException as e:
+            record["status"] = "error"
+            record["error"] = f"{e}"
+            raise
+        finally:
+            record["wall_seconds"] = time.perf_counter() - wall
+            record["cpu_seconds"] = time.process_time() - cpu
+            record["child_cpu_seconds"] = children_cpu_seconds() - child_cpu
+            record["peak_rss_mb"] = sampler.stop()
+            record["process_peak_rss_mb"], record["child_process_peak_rss_mb"] = peak_rss_mb()
+
+            # Turn the counters the stage filled in into rates
+            if record.get("frames"):
+                record["frames_per_second"] = record["frames"] / \
+                    max(record["wall_seconds"], 1e-9)
+            if record.get("audio_seconds"):
+                record["audio_seconds_per_second"] = record["audio_seconds"] / \
+                    max(record["wall_seconds"], 1e-9)
+
+            self._stop_profiler(profiler, name)
+            thread.name = thread_name
+            self._emit(record)
+
+    def event(self, kind, stage, **fields):
+        self._emit(dict({"type": kind, "job": self.job_key, "stage": stage}, **fields))
+
+    def cache(self, stage, hit, **fields):
+        self.event("cache_hit" if hit else "cache_miss", stage, **fields)
+
+    def _start_profiler(self):
+        if not self.profile:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Only one profiler can be active at a time; another stage has it
+            return None
+        return profiler
+
+    def _stop_profiler(self, profiler, name):
+        if profiler is None:
+            return
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(
+            f"{PROFILE_DIR}/{self.job_key[:12]}_{name}_{int(time.time())}.prof")
+
+    def _emit(self, record):
+        record["time"] = time.time()
+        self.records.append(record)
+        with _write_lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
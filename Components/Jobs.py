@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from Components.Instrumentation import StageRecorder
+
+# ----------------------------------------------------------------------------
+# Local background job queue.
+#
+# Like the model registry, the queue lives at module level so it survives
+# Streamlit reruns and is shared by every session in the process. Jobs are
+# keyed by the video's file hash, so identical uploads share one job.
+# ----------------------------------------------------------------------------
+
+# Number of jobs that may be in flight at once
+JOB_WORKERS = 4
+
+# How many stages of each kind may run at the same time across all jobs
+STAGE_LIMITS = {
+    "decode": 2,      # ffmpeg audio decoding
+    "inference": 1,   # Whisper and the emotion classifier share the GPU/CPU
+    "encode": 1,      # each render already fans out to its own worker pool
+}
+
+
+class Job:
+    def __init__(self, key, stages, limits):
+        self.key = key
+        self.status = "queued"
+        self.stages = {name: "pending" for name in stages}
+        self.result = None
+        self.previews = []
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.metrics = StageRecorder(key)
+        self._limits = limits
+
+    @contextmanager
+    def stage(self, name, kind=None):
+        # Wait for a free slot of this stage kind before running it
+        limit = self._limits.get(kind)
+        self.stages[name] = "waiting"
+        if limit:
+            limit.acquire()
+        try:
+            self.stages[name] = "running"
+
+            # Time the stage itself, not the wait for a slot
+            with self.metrics.stage(name) as record:
+                yield record
+            self.stages[name] = "done"
+        except BaseException:
+            self.stages[name] = "failed"
+            raise
+        finally:
+            if limit:
+                limit.release()
+
+    def skip(self, name):
+        self.stages[name] = "skipped"
+
+    def progress(self):
+        finished = sum(1 for state in self.stages.values()
+                       if state in ("done", "skipped"))
+        return finished / len(self.stages) if self.stages else 1.0
+
+    def active(self):
+        return self.status in ("queued", "running")
+
+
+class JobQueue:
+    def __init__(self, workers=JOB_WORKERS, stage_limits=STAGE_LIMITS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="shorts-job")
+        self._limits = {kind: threading.BoundedSemaphore(n)
+                        for kind, n in stage_limits.items()}
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, stages, fn, *args, **kwargs):
+        with self._lock:
+            # Share the job that's already working on this file
+            existing = self._jobs.get(key)
+            if existing is not None and existing.active():
+                return existing, False
+
+            job = Job(key, stages, self._limits)
+            self._jobs[key] = job
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job, True
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def paths_in_use(self, directory):
+        # Files in directory that eviction must leave alone: anything an
+        # unfinished job may still write or reload, and the clips (and
+        # previews) that finished jobs are still showing
+        with self._lock:
+            jobs = list(self._jobs.values())
+
+        keep = set()
+        for job in jobs:
+            keep.update(job.previews)
+            if job.status == "done":
+                keep.update(job.result or [])
+
+        # Every artifact of a job is named after its file hash
+        active = tuple(f"{job.key}_" for job in jobs if job.active())
+        if active and os.path.isdir(directory):
+            for entry in os.scandir(directory):
+                if entry.name.startswith(active):
+                    keep.add(entry.path)
+        return keep
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        try:
+            job.result = fn(*args, job=job, **kwargs)
+            job.status = "done"
+        except BaseException as e:
+            job.error = f"{e}"
+            job.status = "failed"
+
+            # *** Debugging Message *** #
+            print(f"There Was a Processing Error: {e}")
+            traceback.print_exc()
+        finally:
+            job.finished = time.time()
+
+
+# The single job queue shared by the whole process
+job_queue = JobQueue()
@@ -0,0 +1,76 @@
+import importlib
+import sys
+import threading
+import types
+
+# ----------------------------------------------------------------------------
+# Lazy imports for heavy dependencies.
+#
+# torch, cv2, moviepy and friends take seconds to import, and most runs never
+# touch them because every artifact is already cached. A lazy module only
+# imports the real one the first time one of its attributes is used, i.e.
+# when a stage actually runs on a cache miss.
+# ----------------------------------------------------------------------------
+
+# Modules worth importing ahead of time once the UI is up
+WARM_MODULES = ("torch", "cv2", "faster_whisper", "transformers")
+
+# Guards the one-off background warm-up
+_warm_lock = threading.Lock()
+_warm_thread = None
+
+
+class LazyModule(types.ModuleType):
+    # Stands in for a module until one of its attributes is first used
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+# ----------------------------------------------------------------------------
+# Get a module that is imported on first use (or the module itself if it has
+# already been imported).
+# ----------------------------------------------------------------------------
+
+
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+# ----------------------------------------------------------------------------
+# Import the heavy modules on a background thread, once per process, so the
+# first cache miss doesn't pay for them while the UI stays responsive.
+# ----------------------------------------------------------------------------
+
+
+def warm_imports(names=WARM_MODULES):
+    global _warm_thread
+
+    def warm():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                # *** Debugging Message *** #
+                print(f"Could Not Pre-Import {name}: {e}")
+
+    with _warm_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=warm, name="warm-imports", daemon=True)
+            _warm_thread.start()
+    return _warm_thread
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ----------------------------------------------------------------------------
+# Process-wide model registry.
+#
+# Streamlit re-executes main.py on every interaction, but imported modules stay
+# in sys.modules, so anything held here survives reruns and is shared by every
+# session served by this process.
+# ----------------------------------------------------------------------------
+
+# Memory budget for all loaded models (override with SHORTSAI_MODEL_MEMORY_MB)
+DEFAULT_MEMORY_BUDGET_MB = int(
+    os.environ.get("SHORTSAI_MODEL_MEMORY_MB", "4096"))
+
+# Rough resident sizes of the faster-whisper (CTranslate2) checkpoints in MB
+WHISPER_SIZES_MB = {
+    "tiny": 75, "tiny.en": 75,
+    "base": 145, "base.en": 145,
+    "small": 485, "small.en": 485,
+    "medium": 1530, "medium.en": 1530,
+    "large-v1": 3090, "large-v2": 3090, "large-v3": 3090,
+}
+
+
+class ModelRegistry:
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        # Maximum number of bytes the registry may keep loaded
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+
+        # Loaded models in least- to most-recently-used order: key -> (model, size)
+        self._models = OrderedDict()
+
+        # Guards the model table and makes sure a model is only loaded once
+        self._lock = threading.RLock()
+
+        # Counters for cache behaviour and time spent loading
+        self.stats = {"hits": 0, "misses": 0,
+                      "evictions": 0, "load_seconds": 0.0}
+
+    def get(self, key, loader, size_fn):
+        with self._lock:
+            # Return the warm model and mark it as most recently used
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._models[key][0]
+
+            # Load the model and record how long it took
+            self.stats["misses"] += 1
+            began = time.perf_counter()
+            model = loader()
+            self.stats["load_seconds"] += time.perf_counter() - began
+
+            self._models[key] = (model, size_fn(model))
+            self._evict()
+
+            # *** Debugging Message *** #
+            print(f"Model Loaded Into Registry: {key}")
+
+            return model
+
+    def _evict(self):
+        # Drop least recently used models until we fit the budget, but never
+        # evict the model that was just requested
+        while len(self._models) > 1 and self.memory_usage() > self.memory_budget:
+            key, _ = self._models.popitem(last=False)
+            self.stats["evictions"] += 1
+
+            # *** Debugging Message *** #
+            print(f"Model Evicted From Registry: {key}")
+
+    def memory_usage(self):
+        return sum(size for _, size in self._models.values())
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats,
+                        loaded=list(self._models),
+                        memory_mb=self.memory_usage() / (1024 * 1024))
+
+
+# The single registry shared by the whole process
+registry = ModelRegistry()
+
+# ----------------------------------------------------------------------------
+# Get a (possibly cached) faster-whisper model.
+# ----------------------------------------------------------------------------
+
+
+def get_whisper_model(model_name="base.en", device="cpu", compute_type="default",
+                      cpu_threads=0, num_workers=1):
+    def load():
+        from faster_whisper import WhisperModel
+        return WhisperModel(model_name, device=device, compute_type=compute_type,
+                            cpu_threads=cpu_threads, num_workers=num_workers)
+
+    def size(_):
+        megabytes = WHISPER_SIZES_MB.get(model_name, 500)
+        # Quantized weights take roughly half the space
+        if "int8" in compute_type:
+            megabytes //= 2
+        return megabytes * 1024 * 1024
+
+    return registry.get(("whisper", model_name, device, compute_type, cpu_threads, num_workers),
+                        load, size)
+
+# ----------------------------------------------------------------------------
+# Get a (possibly cached) transformers text-classification pipeline.
+# ----------------------------------------------------------------------------
+
+
+def get_emotion_classifier(model_name="michellejieli/emotion_text_classifier", device="cpu"):
+    def load():
+        from transformers import pipeline
+        return pipeline("text-classification", model=model_name, device=device)
+
+    def size(classifier):
+        # Count the bytes held by the model's parameters and buffers
+        model = classifier.model
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    return registry.get(("text-classification", model_name, device, "default"), load, size)
+
+# ----------------------------------------------------------------------------
+# Get a (possibly cached) int8 ONNX Runtime text classifier (CPU only).
+# ----------------------------------------------------------------------------
+
+
+def get_onnx_emotion_classifier(model_name="michellejieli/emotion_text_classifier", threads=0):
+    def load():
+        from Components.OnnxClassifier import OnnxTextClassifier
+        return OnnxTextClassifier(model_name, threads=threads)
+
+    def size(classifier):
+        # The quantized weights are mapped in more or less as stored
+        return os.path.getsize(classifier.path)
+
+    return registry.get(("text-classification", model_name, "cpu", "onnx-int8", threads), load, size)
@@ -0,0 +1,126 @@
+import inspect
+import os
+import tempfile
+from types import SimpleNamespace
+import numpy as np
+
+# ----------------------------------------------------------------------------
+# ONNX Runtime backend for the text classifier.
+#
+# The transformers model is exported to ONNX once, its weights quantized to
+# int8 with ONNX Runtime's dynamic quantization, and the result kept in
+# ONNX_DIR so later runs (and other processes) load it straight away.
+# ----------------------------------------------------------------------------
+
+# Where exported models are kept (outside temp_files/ so eviction skips them)
+ONNX_DIR = "models/onnx"
+
+# ONNX opset used for the export
+ONNX_OPSET = 14
+
+# ----------------------------------------------------------------------------
+# Export a sequence-classification model to int8 ONNX (once) and return
+# the path of the quantized file.
+# ----------------------------------------------------------------------------
+
+
+def export_quantized_model(model_name, directory=ONNX_DIR):
+    path = os.path.join(directory, f"{model_name.replace('/', '--')}-int8.onnx")
+    if os.path.exists(path):
+        return path
+
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    # *** Debugging Message *** #
+    print(f"Exporting {model_name} To ONNX (int8)...")
+
+    os.makedirs(directory, exist_ok=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    # Trace with a small example; batch and sequence length stay dynamic. The
+    # inputs go in by keyword, so they're named in forward()'s order (BERT-style
+    # tokenizers return token_type_ids before attention_mask)
+    example = dict(tokenizer(["An example sentence to trace."], return_tensors="pt"))
+    input_names = [name for name in inspect.signature(model.forward).parameters
+                   if name in example]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    # Write to unique temporary files and rename at the end, so a crash never
+    # leaves a half-written model at the final path and two processes
+    # exporting at once don't write over each other
+    float_path, quantized_path = (_temporary_path(directory, suffix)
+                                  for suffix in (".fp32.onnx", ".onnx"))
+    try:
+        with torch.no_grad():
+            torch.onnx.export(model, ({name: example[name] for name in input_names},), float_path,
+                              input_names=input_names, output_names=["logits"],
+                              dynamic_axes=dynamic_axes, opset_version=ONNX_OPSET)
+        quantize_dynamic(float_path, quantized_path, weight_type=QuantType.QInt8)
+        os.replace(quantized_path, path)
+    finally:
+        # Newer exporters may put the fp32 weights in a side file
+        for leftover in (float_path, f"{float_path}.data", quantized_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    # *** Debugging Message *** #
+    print(f"Quantized Model Saved To: {path}")
+
+    return path
+
+# ----------------------------------------------------------------------------
+# Create an empty, uniquely named temporary file in a directory.
+# ----------------------------------------------------------------------------
+
+
+def _temporary_path(directory, suffix):
+    handle, path = tempfile.mkstemp(suffix=f"{suffix}.tmp", dir=directory)
+    os.close(handle)
+    return path
+
+
+class OnnxTextClassifier:
+    # Drop-in for a transformers text-classification pipeline: callable on a
+    # list of texts, returning one {"label", "score"} per text, and exposing
+    # .tokenizer and .model.config like the pipeline does.
+
+    def __init__(self, model_name, threads=0, directory=ONNX_DIR):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        self.path = export_quantized_model(model_name, directory)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = SimpleNamespace(config=AutoConfig.from_pretrained(model_name))
+
+        # 0 threads lets ONNX Runtime use every core
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            self.path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def __call__(self, texts, batch_size=32, truncation=True, max_length=512):
+        id2label = self.model.config.id2label
+        predictions = []
+        for first in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(texts[first:first + batch_size], padding=True,
+                                     truncation=truncation, max_length=max_length,
+                                     return_tensors="np")
+            logits = self.session.run(None, {name: array.astype(np.int64)
+                                             for name, array in encoded.items()
+                                             if name in self._input_names})[0]
+
+            # Softmax over the labels, as the pipeline does for single-label models
+            logits = logits - logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            best = probabilities.argmax(axis=1)
+            predictions.extend({"label": id2label[int(i)], "score": float(p[i])}
+                               for i, p in zip(best, probabilities))
+        return predictions
@@ -0,0 +1,368 @@
+import os
+from Components.LazyImports import lazy_import
+from Components.Edits import decode_audio, encode_threads, AUDIO_SAMPLE_RATE, MAX_CLIP_SECONDS, \
+    DEFAULT_ENCODE_PROFILE
+from Components.Transcriptions import transcribe_audio, iter_transcription, TRANSCRIPTION_MODES
+from Components.SentimentAnalysis import analyze_emotions, iter_emotion_batches, emotion_params
+from Components.Helpers import probe_video, save_emotion_analysis, load_emotion_analysis, \
+    load_transcription_segments
+from Components.Subtitles import DEFAULT_CAPTION_STYLE
+from Components.Highlights import select_highlights, render_highlights, highlight_paths, \
+    submit_highlight, IncrementalHighlighter, RENDER_POOL_WORKERS
+from Components.Artifacts import artifact_path
+from Components.SceneDetection import get_scene_cuts, SCENE_PARAMS
+from Components.Seeking import get_keyframes, KEYFRAME_PARAMS
+from Components.Prosody import get_prosody, add_prosody, PROSODY_PARAMS
+from Components.TranscriptIndex import TranscriptIndex
+from Components.Models import registry
+from Components.Pools import get_process_pool, LimitedPool
+
+# Only imported when a stage has to run a model
+torch = lazy_import("torch")
+
+# Stages reported back to the UI, in the order they run
+PIPELINE_STAGES = ["audio", "prosody", "scenes", "keyframes", "transcribe", "emotions", "highlights", "render"]
+
+# In streaming mode transcription, analysis and highlight scoring overlap
+STREAMING_STAGES = ["audio", "prosody", "scenes", "keyframes", "stream", "render"]
+
+# ----------------------------------------------------------------------------
+# The stages a job with these settings will report.
+# ----------------------------------------------------------------------------
+
+
+def pipeline_stages(settings):
+    if settings.get("streaming"):
+        return STREAMING_STAGES
+
+    # Proxy previews render between highlight selection and the full encode
+    if settings.get("preview"):
+        return PIPELINE_STAGES[:-1] + ["preview"] + PIPELINE_STAGES[-1:]
+    return PIPELINE_STAGES
+
+# ----------------------------------------------------------------------------
+# Build the per-video context the stages below share and fill in.
+# ----------------------------------------------------------------------------
+
+
+def new_context(video_path, file_hash, settings):
+    # Pick the transcription settings for this job
+    transcription_params = TRANSCRIPTION_MODES[settings.get(
+        "transcription_mode", "accurate")]
+
+    # Define the transcript artifact path (keyed by the transcription settings)
+    transcript_path = artifact_path(
+        file_hash, "transcript", transcription_params)
+
+    # Define the emotion analysis artifact path (keyed by its model, backend and transcript)
+    emotion_backend = settings.get("emotion_backend", "torch")
+    emotion_path = artifact_path(file_hash, "emotions", dict(
+        emotion_params(emotion_backend), transcript=os.path.basename(transcript_path)))
+
+    return {
+        "video_path": video_path,
+        "file_hash": file_hash,
+        "settings": settings,
+        "transcription_params": transcription_params,
+        "transcript_path": transcript_path,
+        "emotion_path": emotion_path,
+        "emotion_backend": emotion_backend,
+    }
+
+# ----------------------------------------------------------------------------
+# Decode stage: audio (on a transcript or prosody cache miss), the prosody
+# features, the scene-cut index and the keyframe index.
+# ----------------------------------------------------------------------------
+
+
+def decode_stage(ctx, job):
+    video_path, transcript_path = ctx["video_path"], ctx["transcript_path"]
+
+    # *** Debugging Message *** #
+    print("Starting The Audio Processing...")
+
+    # Record which stages will come from the artifact cache
+    prosody_cached = os.path.exists(
+        artifact_path(ctx["file_hash"], "prosody", PROSODY_PARAMS))
+    job.metrics.cache("transcribe", os.path.exists(transcript_path))
+    job.metrics.cache("emotions", os.path.exists(ctx["emotion_path"]))
+    job.metrics.cache("prosody", prosody_cached)
+
+    # The audio is only needed to transcribe and for the prosody features, so
+    # skip it if both are cached
+    if os.path.exists(transcript_path) and prosody_cached:
+        # *** Debugging Message *** #
+        print("Transcript Already Exists; Skipping Audio Extraction...")
+
+        # Nothing to decode
+        ctx["audio"] = None
+        job.skip("audio")
+
+    else:
+        with job.stage("audio", "decode") as record:
+            # Decode the audio straight to a 16 kHz mono array (no WAV on disk)
+            ctx["audio"] = decode_audio(video_path)
+            if ctx["audio"] is not None:
+                record["audio_seconds"] = len(ctx["audio"]) / AUDIO_SAMPLE_RATE
+
+        # If the audio extraction failed
+        if ctx["audio"] is None:
+            raise RuntimeError(
+                "Audio Extraction Failed. See Error Message Above.")
+
+        # *** Debugging Message *** #
+        print("Audio Processing Was a Success...")
+
+    # Loudness and pitch over the whole waveform (cached per video)
+    with job.stage("prosody", "decode") as record:
+        ctx["prosody"] = get_prosody(ctx["audio"], ctx["file_hash"])
+        if not prosody_cached:
+            record["audio_seconds"] = len(ctx["audio"]) / AUDIO_SAMPLE_RATE
+
+    # Only keep the waveform around if it still has to be transcribed
+    if os.path.exists(transcript_path):
+        ctx["audio"] = None
+
+    # Find the shot boundaries once per video (cached next to the transcript)
+    job.metrics.cache("scenes", os.path.exists(
+        artifact_path(ctx["file_hash"], "scenes", SCENE_PARAMS)))
+    with job.stage("scenes", "decode"):
+        ctx["cut_times"] = get_scene_cuts(video_path, ctx["file_hash"])
+
+    # Index the keyframes so every clip can seek straight to its start
+    job.metrics.cache("keyframes", os.path.exists(
+        artifact_path(ctx["file_hash"], "keyframes", KEYFRAME_PARAMS)))
+    with job.stage("keyframes", "decode"):
+        ctx["keyframes"] = get_keyframes(video_path, ctx["file_hash"])
+
+    return ctx
+
+# ----------------------------------------------------------------------------
+# Inference stage: transcription, emotion analysis and highlight selection.
+# ----------------------------------------------------------------------------
+
+
+def analysis_stage(ctx, job):
+    audio = ctx.pop("audio")
+
+    # *** Debugging Message *** #
+    print("Starting Audio Transcription Process...")
+
+    # Transcription using faster_whisper
+    with job.stage("transcribe", "inference") as record:
+        ctx["transcription_segments"] = transcribe_audio(
+            audio, ctx["transcript_path"], None, torch, ctx["transcription_params"])
+        if audio is not None:
+            record["audio_seconds"] = len(audio) / AUDIO_SAMPLE_RATE
+
+    # Release the waveform before the long-running stages
+    del audio
+
+    # *** Debugging Message *** #
+    print("Starting Sentiment Analysis Process...")
+
+    # Emotion analysis using transformers pipeline
+    with job.stage("emotions", "inference") as record:
+        emotions = analyze_emotions(
+            ctx["transcription_segments"], ctx["emotion_path"], None, torch,
+            backend=ctx["emotion_backend"])
+        record["segments"] = len(ctx["transcription_segments"])
+
+    # Rank the best non-overlapping clip windows over the whole video, with
+    # the audio's prosody counted alongside the emotions
+    with job.stage("highlights"):
+        add_prosody(emotions, ctx["prosody"])
+        ctx["highlights"] = select_highlights(
+            emotions, top_n=ctx["settings"]["num_clips"], cut_times=ctx["cut_times"],
+            transcript=TranscriptIndex(ctx["transcription_segments"]))
+
+    return ctx
+
+# ----------------------------------------------------------------------------
+# Encode stage: render every selected highlight.
+# ----------------------------------------------------------------------------
+
+
+def render_stage(ctx, job):
+    video_path, file_hash, highlights = ctx["video_path"], ctx["file_hash"], ctx["highlights"]
+    settings = ctx["settings"]
+    profile = settings.get("encode_profile", DEFAULT_ENCODE_PROFILE)
+    captions = settings.get("caption_style", DEFAULT_CAPTION_STYLE)
+    clips = []
+
+    # If dramatic segments are found
+    if highlights:
+        # *** Debugging Message *** #
+        print("Starting Clip Rendering...")
+
+        # Show quick low-res proxies before committing to the full encode
+        if "preview" in job.stages:
+            with job.stage("preview", "encode"):
+                job.previews = render_highlights(video_path, ctx["transcription_segments"],
+                                                 highlights, file_hash,
+                                                 workers=settings["render_workers"],
+                                                 cut_times=ctx["cut_times"].tolist(),
+                                                 profile="proxy", captions=captions,
+                                                 keyframes=ctx["keyframes"])
+
+        # Record which clips were rendered by an earlier run
+        to_render = []
+        for highlight in highlights:
+            output_path, _ = highlight_paths(file_hash, highlight, profile, captions)
+            cached = os.path.exists(output_path)
+            job.metrics.cache("render", cached,
+                              clip=os.path.basename(output_path))
+            if not cached:
+                to_render.append(highlight)
+
+        # Render every highlight concurrently
+        with job.stage("render", "encode") as record:
+            clips = render_highlights(video_path, ctx["transcription_segments"], highlights,
+                                      file_hash, workers=settings["render_workers"],
+                                      cut_times=ctx["cut_times"].tolist(), profile=profile,
+                                      captions=captions, keyframes=ctx["keyframes"])
+            record["frames"] = probe_video(video_path)["fps"] * sum(
+                min(h["end"] - h["start"], MAX_CLIP_SECONDS) for h in to_render)
+
+        # *** Debugging Message *** #
+        print(f"Final Clips Ready For Viewing At: {clips}")
+    else:
+        if "preview" in job.stages:
+            job.skip("preview")
+        job.skip("render")
+
+        # *** Debugging Message *** #
+        print("No Dramatic Segments Detected...")
+
+    # Record how the model registry is doing
+    job.metrics.event("model_registry", "pipeline", **registry.snapshot())
+
+    return clips
+
+# ----------------------------------------------------------------------------
+# Run the whole pipeline for one video and return the rendered clip paths.
+# ----------------------------------------------------------------------------
+
+
+def process_video(video_path, file_hash, settings, job, remove_source=True):
+    try:
+        # *** Debugging Message *** #
+        print("Video Processing Has Begun...")
+
+        ctx = new_context(video_path, file_hash, settings)
+
+        # Let clips start rendering while later audio is still being transcribed
+        if settings.get("streaming"):
+            return _process_video_streaming(ctx, job)
+
+        clips = render_stage(analysis_stage(decode_stage(ctx, job), job), job)
+
+        # *** Debugging Message *** #
+        print("Processing Completed Successfully! Go Watch The Clips!")
+
+        return clips
+
+    finally:
+        # The job owns the uploaded copy of the video, so clean it up here
+        if remove_source and os.path.exists(video_path):
+            os.remove(video_path)
+
+            # *** Debugging Message *** #
+            print(f"Temporary File Has Been Deleted From: {video_path}")
+
+# ----------------------------------------------------------------------------
+# Streaming variant of the pipeline: transcript segments flow straight into
+# micro-batched emotion classification and an incremental highlight scorer,
+# and each highlight starts rendering as soon as it is settled.
+# ----------------------------------------------------------------------------
+
+
+def _process_video_streaming(ctx, job):
+    # Audio, prosody, scene cuts and keyframes are needed up front either way
+    decode_stage(ctx, job)
+    video_path, file_hash, settings = ctx["video_path"], ctx["file_hash"], ctx["settings"]
+    transcript_path, emotion_path = ctx["transcript_path"], ctx["emotion_path"]
+    audio, prosody = ctx.pop("audio"), ctx["prosody"]
+    cut_times, keyframes = ctx["cut_times"], ctx["keyframes"]
+
+    profile = settings.get("encode_profile", DEFAULT_ENCODE_PROFILE)
+    threads = encode_threads(settings["render_workers"])
+    captions = settings.get("caption_style", DEFAULT_CAPTION_STYLE)
+    # Indexed as it grows, so each clip finds its segments by bisection
+    transcript = TranscriptIndex()
+    emotions = []
+    submitted = []
+
+    pool = LimitedPool(get_process_pool("render", RENDER_POOL_WORKERS), settings["render_workers"])
+
+    # *** Debugging Message *** #
+    print("Starting Streaming Transcription And Analysis...")
+
+    with job.stage("stream", "inference") as record:
+        # Replay cached emotions, or classify segments as they're transcribed
+        if os.path.exists(emotion_path):
+            cached = load_emotion_analysis(emotion_path)
+
+            # The transcript carries the word timings the captions need
+            if os.path.exists(transcript_path):
+                transcript = TranscriptIndex(load_transcription_segments(transcript_path))
+            else:
+                transcript = TranscriptIndex({"timestamp": [e["start"], e["end"]], "text": e["text"]}
+                                             for e in cached)
+            batches = [cached]
+        else:
+            checkpoint_path = artifact_path(
+                file_hash, "transcript-partial", ctx["transcription_params"])
+            segment_stream = iter_transcription(audio, transcript_path, torch,
+                                                ctx["transcription_params"], checkpoint_path)
+            batches = iter_emotion_batches(
+                _collect(segment_stream, transcript), torch, backend=ctx["emotion_backend"])
+
+        # Clips snap to the sentences of the transcript as it grows
+        highlighter = IncrementalHighlighter(
+            settings["num_clips"], cut_times=cut_times, transcript=transcript)
+        for batch in batches:
+            emotions.extend(add_prosody(batch, prosody))
+
+            # Start rendering every highlight that has settled
+            for highlight in highlighter.add(batch):
+                submitted.append(submit_highlight(pool, video_path, transcript,
+                                                  highlight, file_hash, cut_times,
+                                                  profile, threads, captions, keyframes))
+
+        if audio is not None:
+            record["audio_seconds"] = len(audio) / AUDIO_SAMPLE_RATE
+        record["segments"] = len(transcript)
+
+    # Save the complete analysis for later runs
+    if not os.path.exists(emotion_path):
+        save_emotion_analysis(emotions, emotion_path)
+
+    # Fill any remaining slots now the whole timeline is known, then wait
+    with job.stage("render", "encode"):
+        for highlight in highlighter.finish():
+            submitted.append(submit_highlight(pool, video_path, transcript,
+                                              highlight, file_hash, cut_times,
+                                              profile, threads, captions, keyframes))
+
+        for _, future in submitted:
+            if future is not None:
+                # *** Debugging Message *** #
+                print(f"Generated Clip With Subtitles At: {future.result()}")
+
+    clips = [output_path for output_path, _ in submitted]
+
+    # *** Debugging Message *** #
+    print(f"Final Clips Ready For Viewing At: {clips}")
+
+    return clips
+
+# ----------------------------------------------------------------------------
+# Pass a stream through unchanged while keeping a copy of every item.
+# ----------------------------------------------------------------------------
+
+
+def _collect(stream, items):
+    for item in stream:
+        items.append(item)
+        yield item
@@ -0,0 +1,118 @@
+import atexit
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# ----------------------------------------------------------------------------
+# Process-wide worker pools.
+#
+# Pools are started with "spawn": forking the multithreaded Streamlit process
+# (which may have CTranslate2/torch loaded, or be importing them on the warm-up
+# thread) can deadlock the child. Spawned workers are expensive to start, so
+# there is one pool per kind of work, sized once for the most workers that
+# work can use, kept for the life of the process and shared by every job; the
+# models a worker loads stay warm in its own registry between jobs. Callers
+# that want fewer workers submit fewer tasks (or go through a LimitedPool).
+# ----------------------------------------------------------------------------
+
+# Start method for every worker pool
+POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+# Live pools and their sizes, keyed by name
+_pools = {}
+_sizes = {}
+
+# Guards the pool table
+_lock = threading.Lock()
+
+# ----------------------------------------------------------------------------
+# Get the long-lived pool for a kind of work, starting it on first use (or
+# again if a worker died and broke it). Asking for another size replaces the
+# pool rather than starting a second one next to it; work already queued on
+# the old pool still finishes.
+# ----------------------------------------------------------------------------
+
+
+def get_process_pool(name, workers):
+    workers = max(1, workers)
+    with _lock:
+        pool = _pools.get(name)
+        if pool is not None and _sizes[name] != workers:
+            pool.shutdown(wait=False)
+            pool = None
+
+        # A crashed worker breaks the whole pool; ProcessPoolExecutor has no
+        # public flag for that, so check the one it keeps internally
+        if pool is None or getattr(pool, "_broken", False):
+            pool = _pools[name] = ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT)
+            _sizes[name] = workers
+
+            # *** Debugging Message *** #
+            print(f"Started {workers} {name} Worker Process(es)...")
+
+        return pool
+
+
+class LimitedPool:
+    # Submits to a shared pool but keeps at most `limit` of its own tasks
+    # running there at once; the rest wait here (not in the pool's queue),
+    # so one caller's backlog never holds up another's work. submit() never
+    # blocks and returns a future like the pool's own.
+
+    def __init__(self, pool, limit):
+        self._pool = pool
+        self._free = max(1, limit)
+        self._waiting = deque()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        future = Future()
+        with self._lock:
+            self._waiting.append((future, fn, args))
+        self._dispatch()
+        return future
+
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if not self._free or not self._waiting:
+                    return
+                self._free -= 1
+                future, fn, args = self._waiting.popleft()
+
+            try:
+                task = self._pool.submit(fn, *args)
+            except BaseException as e:
+                future.set_exception(e)
+                self._release()
+                continue
+            task.add_done_callback(lambda task, future=future: self._finish(task, future))
+
+    def _finish(self, task, future):
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+        self._release()
+        self._dispatch()
+
+    def _release(self):
+        with self._lock:
+            self._free += 1
+
+# ----------------------------------------------------------------------------
+# Shut every pool down (at interpreter exit).
+# ----------------------------------------------------------------------------
+
+
+def shutdown_pools():
+    with _lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+atexit.register(shutdown_pools)
@@ -0,0 +1,182 @@
+import os
+import numpy as np
+from Components.Artifacts import artifact_path, save_arrays, load_arrays
+
+# Sample rate of the decoded audio
+SAMPLE_RATE = 16000
+
+# Analysis frame length (non-overlapping), in seconds
+FRAME_SECONDS = 0.04
+
+# Frames analysed per NumPy block (~160 s of audio)
+BLOCK_FRAMES = 4096
+
+# Pitch search range in Hz (covers speaking and shouting voices)
+MIN_PITCH, MAX_PITCH = 60.0, 400.0
+
+# Normalized autocorrelation peak a frame needs to count as voiced
+VOICING_THRESHOLD = 0.45
+
+# Frames quieter than this (dBFS) are treated as silence
+SILENCE_DB = -45.0
+
+# Loudness of a segment is compared with this much audio before it (seconds)
+CONTEXT_SECONDS = 30.0
+
+# What counts as a notable change for each feature: a segment scoring at or
+# beyond these gets the full prosody score for that feature
+LOUDNESS_JUMP_DB = 6.0
+PITCH_SPREAD_SEMITONES = (2.0, 6.0)
+SPEECH_RATE_WPS = (2.5, 4.5)
+
+# Parameters that change the frame features (and so are part of the cache key)
+PROSODY_PARAMS = {
+    "frame_seconds": FRAME_SECONDS,
+    "pitch_range": [MIN_PITCH, MAX_PITCH],
+    "voicing_threshold": VOICING_THRESHOLD,
+    "silence_db": SILENCE_DB,
+}
+
+# ----------------------------------------------------------------------------
+# Frame-level loudness (dBFS) and pitch (semitones above 100 Hz, NaN where
+# unvoiced) for a 16 kHz mono waveform.
+#
+# The waveform is walked once in blocks; every block is reshaped into frames
+# and analysed with whole-array operations (pitch from an FFT
+# autocorrelation), so there is no per-sample Python work.
+# ----------------------------------------------------------------------------
+
+
+def analyze_prosody(audio, sample_rate=SAMPLE_RATE):
+    frame = int(sample_rate * FRAME_SECONDS)
+    frames = len(audio) // frame
+    min_lag = int(sample_rate / MAX_PITCH)
+    max_lag = min(int(sample_rate / MIN_PITCH), frame - 1)
+
+    # Zero-padding by max_lag is enough to keep the lags we look at un-aliased
+    fft_size = 1 << int(np.ceil(np.log2(frame + max_lag)))
+
+    loudness = np.empty(frames, dtype=np.float32)
+    pitch = np.full(frames, np.nan, dtype=np.float32)
+    for first in range(0, frames, BLOCK_FRAMES):
+        last = min(frames, first + BLOCK_FRAMES)
+        block = audio[first * frame:last * frame].reshape(last - first, frame)
+        block = block - block.mean(axis=1, keepdims=True)
+
+        # Loudness from the mean power of each frame
+        power = np.square(block).mean(axis=1)
+        loudness[first:last] = 10.0 * np.log10(power + 1e-10)
+
+        # Autocorrelation of every frame at once (Wiener-Khinchin)
+        spectrum = np.fft.rfft(block, n=fft_size, axis=1)
+        autocorrelation = np.fft.irfft(np.abs(spectrum) ** 2, n=fft_size, axis=1)[:, :max_lag + 1]
+
+        # The strongest periodicity in the pitch range, relative to lag 0
+        lags = min_lag + np.argmax(autocorrelation[:, min_lag:], axis=1)
+        strength = autocorrelation[np.arange(len(lags)), lags] / np.maximum(
+            autocorrelation[:, 0], 1e-10)
+        voiced = (strength > VOICING_THRESHOLD) & (loudness[first:last] > SILENCE_DB)
+        pitch[first:last][voiced] = 12.0 * np.log2(sample_rate / lags[voiced] / 100.0)
+
+    return loudness, pitch
+
+# ----------------------------------------------------------------------------
+# Load the frame features for a video, computing and caching them on a miss.
+# ----------------------------------------------------------------------------
+
+
+def get_prosody(audio, file_hash):
+    prosody_path = artifact_path(file_hash, "prosody", PROSODY_PARAMS)
+
+    if os.path.exists(prosody_path):
+        # *** Debugging Message *** #
+        print("Prosody Features Already Exist, Using Existing Features...")
+
+        data = load_arrays(prosody_path)
+        return data["loudness"], data["pitch"]
+
+    loudness, pitch = analyze_prosody(audio)
+    save_arrays(prosody_path, loudness=loudness, pitch=pitch)
+
+    # *** Debugging Message *** #
+    print(f"Prosody Features Computed For {len(loudness) * FRAME_SECONDS:.0f}s Of Audio...")
+
+    return loudness, pitch
+
+# ----------------------------------------------------------------------------
+# Per-segment prosody features from the frame features.
+#
+# Every per-segment mean and variance comes from prefix sums over the frames,
+# indexed by each segment's first and last frame, so the cost doesn't grow
+# with segment length.
+# ----------------------------------------------------------------------------
+
+
+def segment_features(loudness, pitch, starts, ends, word_counts):
+    starts, ends = np.asarray(starts, dtype=np.float64), np.asarray(ends, dtype=np.float64)
+    first = np.clip((starts / FRAME_SECONDS).astype(np.int64), 0, len(loudness))
+    last = np.clip(np.ceil(ends / FRAME_SECONDS).astype(np.int64), 0, len(loudness))
+    last = np.maximum(last, np.minimum(first + 1, len(loudness)))
+    context = np.clip(((starts - CONTEXT_SECONDS) / FRAME_SECONDS).astype(np.int64),
+                      0, len(loudness))
+
+    def prefix(values):
+        return np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+
+    def mean(sums, counts, a, b, default):
+        count = counts[b] - counts[a]
+        return np.where(count > 0, (sums[b] - sums[a]) / np.maximum(count, 1), default)
+
+    # Loudness of the segment and of the audio leading up to it
+    frame_count = np.arange(len(loudness) + 1, dtype=np.float64)
+    loudness_sums = prefix(loudness)
+    segment_loudness = mean(loudness_sums, frame_count, first, last, SILENCE_DB)
+    context_loudness = mean(loudness_sums, frame_count, context, first, segment_loudness)
+
+    # Spread of the voiced pitch within the segment
+    voiced = ~np.isnan(pitch)
+    values = np.where(voiced, pitch, 0.0)
+    voiced_count = prefix(voiced)
+    pitch_mean = mean(prefix(values), voiced_count, first, last, 0.0)
+    pitch_square = mean(prefix(np.square(values)), voiced_count, first, last, 0.0)
+    pitch_spread = np.sqrt(np.maximum(pitch_square - np.square(pitch_mean), 0.0))
+
+    return {
+        "loudness": segment_loudness,
+        "loudness_delta": segment_loudness - context_loudness,
+        "pitch_variance": np.square(pitch_spread),
+        "speech_rate": np.asarray(word_counts, dtype=np.float64) / np.maximum(ends - starts, 0.1),
+        "pitch_spread": pitch_spread,
+    }
+
+# ----------------------------------------------------------------------------
+# Combine the features into one 0-1 score per segment: how much louder than
+# its surroundings, how animated the pitch and how fast the speech is.
+# ----------------------------------------------------------------------------
+
+
+def prosody_scores(features):
+    def scale(values, low, high):
+        return np.clip((values - low) / (high - low), 0.0, 1.0)
+
+    return (scale(features["loudness_delta"], 0.0, LOUDNESS_JUMP_DB)
+            + scale(features["pitch_spread"], *PITCH_SPREAD_SEMITONES)
+            + scale(features["speech_rate"], *SPEECH_RATE_WPS)) / 3.0
+
+# ----------------------------------------------------------------------------
+# Attach a "prosody" score to each emotion (one per transcript segment).
+# ----------------------------------------------------------------------------
+
+
+def add_prosody(emotions, prosody):
+    if not emotions or prosody is None:
+        return emotions
+
+    loudness, pitch = prosody
+    features = segment_features(
+        loudness, pitch,
+        [e["start"] for e in emotions], [e["end"] for e in emotions],
+        [len(e["text"].split()) for e in emotions])
+    for emotion, score in zip(emotions, prosody_scores(features).tolist()):
+        emotion["prosody"] = score
+    return emotions
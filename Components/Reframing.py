@@ -0,0 +1,113 @@
+import numpy as np
+
+# Length of the smoothing window, in seconds
+SMOOTHING_SECONDS = 1.0
+
+# Polynomial order of the Savitzky-Golay filter
+SMOOTHING_ORDER = 2
+
+# A per-frame move wider than this fraction of the frame is treated as a cut
+CUT_THRESHOLD = 0.1
+
+# The crop holds still until the smoothed track drifts this far (fraction of
+# the frame width) from it, so detector jitter on a static subject doesn't
+# show as shimmer once the crop is upscaled
+DEADBAND = 0.005
+
+# ----------------------------------------------------------------------------
+# Savitzky-Golay smoothing coefficients for a window and polynomial order.
+# ----------------------------------------------------------------------------
+
+
+def savgol_coefficients(window, order):
+    half = window // 2
+    offsets = np.arange(-half, half + 1)
+
+    # Least-squares fit of a polynomial to the window; the first row of the
+    # pseudo-inverse gives the fitted value at the window's center
+    design = np.vander(offsets, order + 1, increasing=True)
+    return np.linalg.pinv(design)[0]
+
+# ----------------------------------------------------------------------------
+# Smooth a center track with a Savitzky-Golay filter (edges padded).
+# ----------------------------------------------------------------------------
+
+
+def smooth_track(centers, window, order=SMOOTHING_ORDER):
+    # The window has to be odd and can't be longer than the track
+    window = min(window, len(centers) - (len(centers) + 1) % 2)
+    if window <= order + 1:
+        return centers.astype(np.float64)
+
+    half = window // 2
+    padded = np.pad(centers.astype(np.float64), half, mode="edge")
+    return np.convolve(padded, savgol_coefficients(window, order)[::-1], mode="valid")
+
+# ----------------------------------------------------------------------------
+# Find the frames where the subject (or shot) changes abruptly.
+# ----------------------------------------------------------------------------
+
+
+def detect_track_cuts(centers, width, threshold=CUT_THRESHOLD):
+    return np.flatnonzero(np.abs(np.diff(centers)) > threshold * width) + 1
+
+# ----------------------------------------------------------------------------
+# Hold a track still until it moves more than the deadband, then follow it
+# from the edge of the band (hysteresis), so real motion is kept and
+# sub-band wobble is dropped.
+# ----------------------------------------------------------------------------
+
+
+def apply_deadband(track, deadband):
+    held = np.empty(len(track), dtype=np.float64)
+    position = float(track[0]) if len(track) else 0.0
+    for index, value in enumerate(track.tolist()):
+        if value > position + deadband:
+            position = value - deadband
+        elif value < position - deadband:
+            position = value + deadband
+        held[index] = position
+    return held
+
+# ----------------------------------------------------------------------------
+# Turn a per-frame face center track into a smoothed per-frame crop offset.
+#
+# Each shot between cuts is smoothed (and deadbanded) on its own so the
+# window snaps to the new subject on a cut instead of panning across to it.
+# ----------------------------------------------------------------------------
+
+
+def compute_crop_path(centers, fps, width, crop_width, cuts=None,
+                      smoothing_seconds=SMOOTHING_SECONDS, deadband=DEADBAND):
+    if len(centers) == 0:
+        return np.zeros(0, dtype=np.int32)
+
+    if cuts is None:
+        cuts = detect_track_cuts(centers, width)
+
+    # Odd window length in frames
+    window = int(smoothing_seconds * fps) // 2 * 2 + 1
+
+    smoothed = np.empty(len(centers), dtype=np.float64)
+    bounds = np.concatenate(([0], np.asarray(cuts, dtype=np.int64), [len(centers)]))
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        if last > first:
+            smoothed[first:last] = apply_deadband(
+                smooth_track(centers[first:last], window), deadband * width)
+
+    # Keep the window inside the frame
+    lefts = np.clip(np.rint(smoothed - crop_width / 2), 0, width - crop_width)
+    return lefts.astype(np.int32)
+
+# ----------------------------------------------------------------------------
+# Write a crop path as an ffmpeg sendcmd script (one command per change).
+# ----------------------------------------------------------------------------
+
+
+def write_sendcmd(lefts, fps, path):
+    # Only frames where the offset changes need a command
+    changes = np.flatnonzero(np.diff(lefts, prepend=lefts[0] - 1))
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"{index / fps:.4f} crop x {lefts[index]};\n"
+                     for index in changes.tolist())
+    return path
@@ -0,0 +1,130 @@
+import os
+import numpy as np
+import ffmpeg
+from Components.Artifacts import artifact_path, save_arrays, load_arrays
+from Components.Helpers import probe_video
+
+# Size frames are scaled to before comparing them
+SCENE_FRAME_WIDTH, SCENE_FRAME_HEIGHT = 64, 36
+
+# Number of gray levels per histogram
+HISTOGRAM_BINS = 16
+
+# Histogram distance (0 = identical, 1 = disjoint) that counts as a cut
+CUT_THRESHOLD = 0.35
+
+# Shortest shot we accept, in seconds (suppresses flashes and fades)
+MIN_SCENE_SECONDS = 0.5
+
+# Frames analysed per NumPy batch
+BATCH_FRAMES = 512
+
+# Parameters that change the index (and so are part of its cache key)
+SCENE_PARAMS = {
+    "size": [SCENE_FRAME_WIDTH, SCENE_FRAME_HEIGHT],
+    "bins": HISTOGRAM_BINS,
+    "threshold": CUT_THRESHOLD,
+    "min_scene_seconds": MIN_SCENE_SECONDS,
+}
+
+# ----------------------------------------------------------------------------
+# Find shot boundaries in one streaming pass over a video.
+#
+# Frames are decoded tiny and grayscale, and each batch's histograms and
+# frame-to-frame distances are computed at once with NumPy.
+# ----------------------------------------------------------------------------
+
+
+def detect_scene_cuts(video_path, threshold=CUT_THRESHOLD, min_scene_seconds=MIN_SCENE_SECONDS):
+    fps = probe_video(video_path)["fps"]
+    pixels = SCENE_FRAME_WIDTH * SCENE_FRAME_HEIGHT
+    shift = 8 - int(np.log2(HISTOGRAM_BINS))
+
+    process = (
+        ffmpeg.input(video_path)
+        .output('pipe:', format='rawvideo', pix_fmt='gray', an=None,
+                s=f"{SCENE_FRAME_WIDTH}x{SCENE_FRAME_HEIGHT}")
+        .global_args('-loglevel', 'error')
+        .run_async(pipe_stdout=True)
+    )
+
+    cut_frames = []
+    previous = None
+    frame_offset = 0
+    try:
+        while True:
+            data = process.stdout.read(pixels * BATCH_FRAMES)
+            count = len(data) // pixels
+            if count == 0:
+                break
+
+            # Histogram every frame of the batch with a single bincount
+            levels = np.frombuffer(data, np.uint8, count * pixels).reshape(count, pixels) >> shift
+            levels = levels + (np.arange(count, dtype=np.int64) * HISTOGRAM_BINS)[:, None]
+            histograms = np.bincount(levels.ravel(), minlength=count * HISTOGRAM_BINS).reshape(
+                count, HISTOGRAM_BINS) / pixels
+
+            # Compare each frame with the one before it (including across batches)
+            if previous is not None:
+                histograms = np.vstack((previous, histograms))
+            distances = 0.5 * np.abs(np.diff(histograms, axis=0)).sum(axis=1)
+            first = frame_offset if previous is not None else frame_offset + 1
+            cut_frames.extend((np.flatnonzero(distances > threshold) + first).tolist())
+
+            previous = histograms[-1:]
+            frame_offset += count
+    finally:
+        process.stdout.close()
+        process.wait()
+
+    # Drop cuts that follow another too closely
+    cut_times = []
+    for frame in cut_frames:
+        time = frame / fps
+        if not cut_times or time - cut_times[-1] >= min_scene_seconds:
+            cut_times.append(time)
+
+    return np.array(cut_times, dtype=np.float64)
+
+# ----------------------------------------------------------------------------
+# Load the scene-cut index for a video, building and caching it on a miss.
+# ----------------------------------------------------------------------------
+
+
+def get_scene_cuts(video_path, file_hash):
+    scenes_path = artifact_path(file_hash, "scenes", SCENE_PARAMS)
+
+    if os.path.exists(scenes_path):
+        # *** Debugging Message *** #
+        print("Scene Index Already Exists, Using Existing Index...")
+
+        return load_arrays(scenes_path)["cut_times"]
+
+    cut_times = detect_scene_cuts(video_path)
+    save_arrays(scenes_path, cut_times=cut_times)
+
+    # *** Debugging Message *** #
+    print(f"Scene Index Built With {len(cut_times)} Cuts...")
+
+    return cut_times
+
+# ----------------------------------------------------------------------------
+# Snap a clip window to nearby cuts so it doesn't open or close mid-shot.
+# ----------------------------------------------------------------------------
+
+
+def snap_to_cuts(start_time, end_time, cut_times, tolerance=2.0):
+    if len(cut_times) == 0:
+        return start_time, end_time
+
+    # Start on a cut just after the window opens (skipping the previous shot's tail)
+    index = np.searchsorted(cut_times, start_time)
+    if index < len(cut_times) and cut_times[index] - start_time <= tolerance:
+        start_time = float(cut_times[index])
+
+    # End on a cut just before the window closes
+    index = np.searchsorted(cut_times, end_time) - 1
+    if index >= 0 and end_time - cut_times[index] <= tolerance and cut_times[index] > start_time:
+        end_time = float(cut_times[index])
+
+    return start_time, end_time
@@ -0,0 +1,92 @@
+import os
+import subprocess
+import numpy as np
+import ffmpeg
+from Components.Artifacts import artifact_path, save_arrays, load_arrays
+from Components.Helpers import probe_video
+
+# Parameters that change the index (and so are part of its cache key)
+KEYFRAME_PARAMS = {"stream": "v:0"}
+
+# ----------------------------------------------------------------------------
+# List the keyframe times of a video's first video stream.
+#
+# ffprobe only reads packet headers here (nothing is decoded), and its CSV
+# output is parsed line by line so a multi-hour file never sits in memory.
+# Times are relative to the start of the file, as ffmpeg's -ss expects.
+# ----------------------------------------------------------------------------
+
+
+def scan_keyframes(video_path):
+    process = subprocess.Popen(
+        ["ffprobe", "-v", "error", "-select_streams", KEYFRAME_PARAMS["stream"],
+         "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_path],
+        stdout=subprocess.PIPE, text=True)
+
+    keyframes = []
+    try:
+        for line in process.stdout:
+            pts_time, _, flags = line.strip().partition(",")
+            if "K" in flags and pts_time not in ("", "N/A"):
+                keyframes.append(float(pts_time))
+    finally:
+        process.stdout.close()
+        process.wait()
+
+    # Packets come in decode order, so sort by presentation time
+    start_time = probe_video(video_path)["start_time"]
+    return np.unique(np.array(keyframes, dtype=np.float64) - start_time)
+
+# ----------------------------------------------------------------------------
+# Load the keyframe index for a video, building and caching it on a miss.
+# ----------------------------------------------------------------------------
+
+
+def get_keyframes(video_path, file_hash):
+    keyframes_path = artifact_path(file_hash, "keyframes", KEYFRAME_PARAMS)
+
+    if os.path.exists(keyframes_path):
+        # *** Debugging Message *** #
+        print("Keyframe Index Already Exists, Using Existing Index...")
+
+        return load_arrays(keyframes_path)["keyframes"]
+
+    keyframes = scan_keyframes(video_path)
+    save_arrays(keyframes_path, keyframes=keyframes)
+
+    # *** Debugging Message *** #
+    print(f"Keyframe Index Built With {len(keyframes)} Keyframes...")
+
+    return keyframes
+
+# ----------------------------------------------------------------------------
+# The last keyframe at or before a time (None if there isn't one).
+# ----------------------------------------------------------------------------
+
+
+def keyframe_before(keyframes, time):
+    index = np.searchsorted(keyframes, time, side="right") - 1
+    return float(keyframes[index]) if index >= 0 else None
+
+# ----------------------------------------------------------------------------
+# Open a range of a video as (video, audio) streams starting at exactly
+# start_time.
+#
+# With a known keyframe, the input seeks straight to it (no frames before it
+# are read or decoded) and a trim drops the few frames up to start_time, so
+# the cost of getting there doesn't depend on where the clip is in the file.
+# Without one, ffmpeg's own input-side seek is used.
+# ----------------------------------------------------------------------------
+
+
+def seek_input(video_path, start_time, duration, keyframe=None):
+    if keyframe is None or keyframe > start_time:
+        source = ffmpeg.input(video_path, ss=start_time, t=duration)
+        return source.video, source.audio
+
+    offset = start_time - keyframe
+    source = ffmpeg.input(video_path, ss=keyframe, t=offset + duration,
+                          noaccurate_seek=None)
+    video = source.video.trim(start=offset).setpts('PTS-STARTPTS')
+    audio = source.audio.filter('atrim', start=offset).filter('asetpts', 'PTS-STARTPTS')
+    return video, audio
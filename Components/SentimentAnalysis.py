@@ -1,61 +1,109 @@
-from transformers import pipeline
 import os
-from Components.Helpers import chunk_text_with_timestamps, save_emotion_analysis, load_emotion_analysis
+import time
+from Components.Helpers import save_emotion_analysis, load_emotion_analysis
+from Components.Models import get_emotion_classifier, get_onnx_emotion_classifier
+
+# Number of segments sent through the classifier at once
+EMOTION_BATCH_SIZE = 32
+
+# Parameters that change the analysis (and so are part of its cache key)
+EMOTION_PARAMS = {
+    "model": "michellejieli/emotion_text_classifier",
+    "granularity": "segment",
+}
+
+# Inference backends: the PyTorch transformers pipeline, or an int8 ONNX
+# Runtime export of the same model (CPU only)
+EMOTION_BACKENDS = ("torch", "onnx")
+
+# ONNX Runtime threads (0 uses every core)
+ONNX_THREADS = int(os.environ.get("SHORTSAI_ONNX_THREADS", "0"))
 
 # ----------------------------------------------------------------------------
-# Analyze emotions from the transcription segments using an emotion classifier.
+# Cache-key parameters for an analysis made with a given backend (the torch
+# backend keeps the original key so existing artifacts stay valid).
 # ----------------------------------------------------------------------------
 
 
-def analyze_emotions(transcription_segments, emotion_path, st, torch):
-    # If an emotional analysis file does not exist
-    if not os.path.exists(emotion_path):
-        # Check if a GPU is available, otherwise use the CPU
-        device_str = "cuda" if torch.cuda.is_available() else "cpu"
+def emotion_params(backend="torch"):
+    return EMOTION_PARAMS if backend == "torch" else dict(EMOTION_PARAMS, backend=backend)
 
-        # Create a pipeline for text classification
-        emotion_analyzer = pipeline(
-            "text-classification",
-            model="michellejieli/emotion_text_classifier",
-            device=device_str
-        )
+# ----------------------------------------------------------------------------
+# Get the classifier for a backend, and the device it runs on.
+# ----------------------------------------------------------------------------
 
-        # Chunk the transcription segments into smaller pieces with timestamps
-        transcription_chunks = chunk_text_with_timestamps(
-            transcription_segments)
 
-        # Initialize an empty list to store the emotion analysis results
-        emotions = []
+def get_emotion_analyzer(torch, backend="torch", threads=ONNX_THREADS):
+    if backend == "onnx":
+        return get_onnx_emotion_classifier(EMOTION_PARAMS["model"], threads=threads), "cpu"
 
-        # Iterate over each chunk of transcription segments
-        for chunk in transcription_chunks:
+    # Check if a GPU is available, otherwise use the CPU
+    device_str = "cuda" if torch.cuda.is_available() else "cpu"
 
-            # Extract the text from the chunk and join it into a single string
-            chunk_text = " ".join([text for _, _, text in chunk])
+    # Get the text classification pipeline (loaded once per process and kept warm)
+    return get_emotion_classifier(EMOTION_PARAMS["model"], device=device_str), device_str
 
-            # Analyze the emotions in the chunk of text using the emotion analyzer
-            chunk_emotions = emotion_analyzer(chunk_text)
+# ----------------------------------------------------------------------------
+# Classify a list of segments, returning one emotion per segment.
+# ----------------------------------------------------------------------------
 
-            # Iterate over the emotions
-            for emotion, (start_time, end_time, text) in zip(chunk_emotions, chunk):
 
-                # Add the start time to the emotion dictionary
-                emotion["start"] = start_time
+def classify_segments(transcription_segments, emotion_analyzer, batch_size=EMOTION_BATCH_SIZE):
+    # Classify every segment on its own so each one gets a label and score
+    texts = [segment["text"].strip() for segment in transcription_segments]
+
+    # Sort by length so each batch is padded only to its own longest segment
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+
+    # Truncate anything longer than the model can take
+    max_length = min(emotion_analyzer.tokenizer.model_max_length,
+                     getattr(emotion_analyzer.model.config, "max_position_embeddings", 512))
+
+    # Run the sorted segments through the pipeline in batches
+    predictions = emotion_analyzer(
+        [texts[i] for i in order],
+        batch_size=batch_size,
+        truncation=True,
+        max_length=max_length
+    )
+
+    # Put the predictions back in segment order
+    emotions = [None] * len(texts)
+    for i, prediction in zip(order, predictions):
+        segment = transcription_segments[i]
+        emotions[i] = {
+            "label": prediction["label"],
+            "score": prediction["score"],
+            "start": segment["timestamp"][0],
+            "end": segment["timestamp"][1],
+            "text": segment["text"]
+        }
+    return emotions
+
+# ----------------------------------------------------------------------------
+# Analyze emotions from the transcription segments using an emotion classifier.
+# ----------------------------------------------------------------------------
 
-                # Add the end time to the emotion dictionary
-                emotion["end"] = end_time
 
-                # Add the text to the emotion dictionary
-                emotion["text"] = text
+def analyze_emotions(transcription_segments, emotion_path, st, torch, batch_size=EMOTION_BATCH_SIZE,
+                     backend="torch"):
+    # If an emotional analysis file does not exist
+    if not os.path.exists(emotion_path):
+        # Get the classifier (loaded once per process and kept warm)
+        emotion_analyzer, device_str = get_emotion_analyzer(torch, backend)
 
-            # Add the emotion analysis results to the list of emotions
-            emotions.extend(chunk_emotions)
+        # Classify every segment in batches
+        began = time.perf_counter()
+        emotions = classify_segments(
+            transcription_segments, emotion_analyzer, batch_size)
+        elapsed = time.perf_counter() - began
 
         # Save the emotion analysis results to a file
         save_emotion_analysis(emotions, emotion_path)
 
         # *** Debugging Message *** #
-        print("Sentiment Analysis Was a Success...")
+        print(
+            f"Sentiment Analysis Was a Success ({len(emotions) / max(elapsed, 1e-9):.1f} segments/sec on {device_str}/{backend})...")
 
     else:  # If the emotion analysis file already exists
 
@@ -66,3 +114,24 @@ def analyze_emotions(transcription_segments, emotion_path, st, torch):
         print("Sentiment Analysis Already Exists, Using Existing Analysis...")
 
     return emotions
+
+# ----------------------------------------------------------------------------
+# Classify a stream of segments in micro-batches, yielding each batch's
+# emotions as soon as it is classified.
+# ----------------------------------------------------------------------------
+
+
+def iter_emotion_batches(segment_stream, torch, batch_size=EMOTION_BATCH_SIZE, backend="torch"):
+    # Get the classifier (loaded once per process and kept warm)
+    emotion_analyzer, _ = get_emotion_analyzer(torch, backend)
+
+    batch = []
+    for segment in segment_stream:
+        batch.append(segment)
+        if len(batch) >= batch_size:
+            yield classify_segments(batch, emotion_analyzer, batch_size)
+            batch = []
+
+    # Flush whatever is left at the end of the stream
+    if batch:
+        yield classify_segments(batch, emotion_analyzer, batch_size)
@@ -1,148 +1,228 @@
-from moviepy.video.io.VideoFileClip import VideoFileClip
-from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
-from moviepy.video.VideoClip import ImageClip
-from PIL import Image, ImageDraw, ImageFont
+import math
+import os
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
 import textwrap
 import numpy as np
 import ffmpeg
-from Components.Helpers import format_timestamp
-from streamlit import warning
+from Components.Helpers import format_timestamp, format_ass_timestamp, iter_words
+from Components.Edits import ENCODE_PROFILES, DEFAULT_ENCODE_PROFILE, encoder_options
+from Components.LazyImports import lazy_import
 
-# ----------------------------------------------------------------------------
-# Overlay subtitles on the video.
-# ----------------------------------------------------------------------------
+# Drawing and UI modules are only imported when subtitles are overlaid
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
+ImageFont = lazy_import("PIL.ImageFont")
+st = lazy_import("streamlit")
 
+# Font size of overlaid subtitles
+FONT_SIZE = int(48 * 2.5)
 
-def add_subtitles(video_path, subtitles, output_path):
-    # Create a VideoFileClip object from the given video path
-    video = VideoFileClip(video_path)
+# Width of the black outline drawn around the text, in pixels
+STROKE_WIDTH = 4
 
-    # Initialize an empty list to store the subtitle clips
-    subtitle_clips = []
+# Space between the text and the edge of its translucent banner
+BANNER_PADDING = 12
 
-    # Set the default font path to arialbd.ttf
-    font_path = "arialbd.ttf"
+# Vertical gap between wrapped lines
+LINE_SPACING = 4
+
+# Subtitles are centered this far down the frame
+SUBTITLE_POSITION = 0.75
+
+# Caption styles a clip can use: whole segments (SRT), short word groups, or
+# karaoke (ASS, each word lighting up as it is spoken)
+CAPTION_STYLES = ("segments", "words", "karaoke")
 
-    # Set the font size
-    font_size = int(48 * 2.5)
+# Caption style used when a job doesn't pick one
+DEFAULT_CAPTION_STYLE = "words"
+
+# Most words and characters shown at once in word-group captions
+GROUP_MAX_WORDS = 3
+GROUP_MAX_CHARS = 20
+
+# A pause between words longer than this (seconds) starts a new group
+GROUP_PAUSE = 0.5
+
+# ASS header for the word-group and karaoke captions (sized for a 1080x1920
+# short; karaoke words fill from the secondary to the primary colour)
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 1080
+PlayResY: 1920
+WrapStyle: 0
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Impact,110,{primary},&H00FFFFFF,&H00000000,&H80000000,0,0,0,0,100,100,0,0,1,6,0,2,60,60,480,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+# ----------------------------------------------------------------------------
+# Find the subtitle font, falling back to Windows' copy or PIL's default.
+# ----------------------------------------------------------------------------
 
-    # Set the outline color for the text
-    outline_color = "black"
 
-    # Set the text color
-    text_color = "white"
+def find_font_path():
+    # Set the default font path to arialbd.ttf
+    font_path = "arialbd.ttf"
 
     # Check if the specified font path does not exist
-    if not __import__("os").path.exists(font_path):
+    if not os.path.exists(font_path):
         # Define an alternate font path
         alternate_font = "C:/Windows/Fonts/arialbd.ttf"
 
         # Check if the alternate font path exists
-        if __import__("os").path.exists(alternate_font):
+        if os.path.exists(alternate_font):
             # If it exists, use the alternate font path
             font_path = alternate_font
 
         else:  # If neither font path exists
 
             # Display a warning message
-            warning("Preferred font not found; falling back to default font.")
+            st.warning("Preferred font not found; falling back to default font.")
 
             # Set the font path to None, which will use the default font
             font_path = None
 
-    # Iterate over each subtitle in the subtitles list
-    for subtitle in subtitles:
-        # Unpack the subtitle tuple into start time, end time, and text
-        orig_start, orig_end, text = subtitle
-
-        # Wrap the text to a maximum width of 40 characters
-        wrapped = textwrap.wrap(text, width=40)
-
-        # If the number of wrapped lines is greater than 3
-        if len(wrapped) > 3:
-            # Truncate the wrapped lines to the first 3 lines
-            wrapped = wrapped[:3]
-
-        # Join the wrapped lines with newline characters
-        text = "\n".join(wrapped)
+    return font_path
 
-        # Calculate the duration of the subtitle
-        duration = orig_end - orig_start
-
-        # If the duration is less than or equal to 0
-        if duration <= 0:
-            # Set the duration to 1.0
-            duration = 1.0
-
-        # Set the height of the image
-        img_height = 125
-
-        # Create a new RGBA image with a semi-transparent background
-        img = Image.new('RGBA', (video.w, img_height), (0, 0, 0, 128))
+# ----------------------------------------------------------------------------
+# Load a font once per process (every subtitle shares it).
+# ----------------------------------------------------------------------------
 
-        # Create a drawing object for the image
-        d = ImageDraw.Draw(img)
 
-        # Try to load the specified font
-        try:
-            # Load the font from the specified font path
-            font = ImageFont.truetype(
-                font_path, font_size) if font_path else ImageFont.load_default()
+@lru_cache(maxsize=8)
+def load_font(font_path, font_size=FONT_SIZE):
+    try:
+        return ImageFont.truetype(font_path, font_size) if font_path else ImageFont.load_default()
 
-        except OSError:  # If an OSError occurs while loading the font
+    except OSError:  # If an OSError occurs while loading the font
 
-            # Display a warning message
-            warning("Error loading chosen font; using default.")
+        # Display a warning message
+        st.warning("Error loading chosen font; using default.")
 
-            # Load the default font
-            font = ImageFont.load_default()
+        # Load the default font
+        return ImageFont.load_default()
 
-        # Get the bounding box of the text
-        text_bbox = d.multiline_textbbox((0, 0), text, font=font, spacing=4)
+# ----------------------------------------------------------------------------
+# Wrap subtitle text to at most 3 lines of 40 characters.
+# ----------------------------------------------------------------------------
 
-        # Calculate the width of the text
-        text_width = text_bbox[2] - text_bbox[0]
 
-        # Calculate the height of the text
-        text_height = text_bbox[3] - text_bbox[1]
+def wrap_subtitle(text, width=40, max_lines=3):
+    return "\n".join(textwrap.wrap(text, width=width)[:max_lines])
 
-        # Calculate the x position of the text
-        x = (video.w - text_width) // 2
 
-        # Calculate the y position of the text
-        y = (img_height - text_height) // 2
+class SubtitleOverlay:
+    # Draws subtitles straight onto video frames. Each distinct line is
+    # rendered once into a tight banner image (kept premultiplied, ready to
+    # blend), the active subtitle for a frame is found by bisecting the sorted
+    # start times, and only the banner's rectangle of the frame is blended.
 
-        # Iterate over the x offsets
-        for dx in range(-2, 3):
-            # Iterate over the y offsets
-            for dy in range(-2, 3):
-                # If both offsets are 0, skip this iteration
-                if dx == 0 and dy == 0:
-                    continue
+    def __init__(self, subtitles, frame_width, frame_height, font):
+        self.frame_width, self.frame_height = frame_width, frame_height
+        self.font = font
 
-                # Draw the text with the outline color
-                d.multiline_text((x+dx, y+dy), text, font=font,
-                                 fill=outline_color, spacing=4)
+        # Sorted interval index: parallel start/end/text lists
+        entries = []
+        for start, end, text in subtitles:
+            # Give zero-length subtitles a second on screen
+            if end - start <= 0:
+                end = start + 1.0
+            entries.append((start, end, wrap_subtitle(text)))
+        entries.sort(key=lambda entry: entry[0])
+        self.starts = [entry[0] for entry in entries]
+        self.ends = [entry[1] for entry in entries]
+        self.texts = [entry[2] for entry in entries]
+
+        # Latest end time among each prefix, so a long subtitle still shows
+        # while shorter later ones come and go
+        self._reach = list(accumulate(self.ends, max))
+
+        # Rendered banners keyed by text: (top, left, premultiplied RGB, alpha)
+        self._banners = {}
+
+    def active(self, t):
+        # The last subtitle starting at or before t, if it hasn't ended yet
+        index = bisect_right(self.starts, t) - 1
+        while index >= 0 and self._reach[index] > t:
+            if self.ends[index] > t:
+                return self.texts[index]
+            index -= 1
+        return None
+
+    def banner(self, text):
+        cached = self._banners.get(text)
+        if cached is not None:
+            return cached
+
+        # Measure the outlined text, then draw it on a tight translucent banner
+        bbox = ImageDraw.Draw(Image.new("RGBA", (1, 1))).multiline_textbbox(
+            (0, 0), text, font=self.font, spacing=LINE_SPACING, align="center",
+            stroke_width=STROKE_WIDTH)
+
+        # Centered multiline boxes can be fractional; round outwards to pixels
+        bbox = (math.floor(bbox[0]), math.floor(bbox[1]), math.ceil(bbox[2]), math.ceil(bbox[3]))
+        width = bbox[2] - bbox[0] + 2 * BANNER_PADDING
+        height = bbox[3] - bbox[1] + 2 * BANNER_PADDING
+        img = Image.new("RGBA", (width, height), (0, 0, 0, 128))
+        ImageDraw.Draw(img).multiline_text(
+            (BANNER_PADDING - bbox[0], BANNER_PADDING - bbox[1]), text, font=self.font,
+            fill="white", spacing=LINE_SPACING, align="center",
+            stroke_width=STROKE_WIDTH, stroke_fill="black")
+        pixels = np.asarray(img, dtype=np.float32) / 255.0
+
+        # Center it on the frame, trimming anything that falls outside
+        left = (self.frame_width - width) // 2
+        top = int(self.frame_height * SUBTITLE_POSITION - height / 2)
+        crop_left, crop_top = max(0, -left), max(0, -top)
+        pixels = pixels[crop_top:self.frame_height - top, crop_left:self.frame_width - left]
+        left, top = max(0, left), max(0, top)
+
+        alpha = pixels[:, :, 3:]
+        cached = (top, left, pixels[:, :, :3] * alpha * 255.0, 1.0 - alpha)
+        self._banners[text] = cached
+        return cached
+
+    def apply(self, frame, t):
+        text = self.active(t)
+        if text is None:
+            return frame
+
+        top, left, color, keep = self.banner(text)
+        bottom, right = top + color.shape[0], left + color.shape[1]
+
+        # Blend only the banner's rectangle into a writable copy of the frame
+        frame = np.array(frame, copy=True)
+        region = frame[top:bottom, left:right]
+        region[:] = (region * keep + color).astype(np.uint8)
+        return frame
 
-        # Draw the text with the text color
-        d.multiline_text((x, y), text, font=font, fill=text_color, spacing=4)
+# ----------------------------------------------------------------------------
+# Overlay subtitles on the video.
+# ----------------------------------------------------------------------------
 
-        # Calculate the y position of the subtitle
-        y_position = int(video.h * 0.75 - img_height / 2)
 
-        # Create an ImageClip object from the image
-        txt_clip = ImageClip(np.array(img)).set_duration(duration).set_start(
-            orig_start).set_position(('center', y_position))
+def add_subtitles(video_path, subtitles, output_path, profile=DEFAULT_ENCODE_PROFILE, threads=None):
+    from moviepy.video.io.VideoFileClip import VideoFileClip
 
-        # Add the subtitle clip to the list of subtitle clips
-        subtitle_clips.append(txt_clip)
+    # Create a VideoFileClip object from the given video path
+    video = VideoFileClip(video_path)
 
-    # Create a CompositeVideoClip object from the video and the subtitle clips
-    video = CompositeVideoClip([video] + subtitle_clips)
+    # Draw the subtitles onto each frame as it is decoded
+    overlay = SubtitleOverlay(subtitles, video.w, video.h,
+                              load_font(find_font_path()))
+    subtitled = video.fl(lambda get_frame, t: overlay.apply(get_frame(t), t))
 
     # Write the video to the specified output path
-    video.write_videofile(output_path, codec='libx264',
-                          bitrate="5000k", fps=video.fps)
+    settings = ENCODE_PROFILES[profile]
+    subtitled.write_videofile(output_path, codec='libx264', preset=settings["preset"],
+                              ffmpeg_params=['-crf', str(settings["crf"])],
+                              threads=threads, fps=video.fps)
 
     # Close the video file
     video.close()
@@ -167,18 +247,118 @@ def write_srt(subtitles, srt_file_path):
             f.write(f"{wrapped_text}\n\n")
             index += 1
 
+# ----------------------------------------------------------------------------
+# Subtitles for a clip, one per transcript segment, relative to its start.
+# ----------------------------------------------------------------------------
+
+
+def segment_subtitles(transcription_segments, start_time, end_time):
+    return [
+        (segment["timestamp"][0] - start_time, segment["timestamp"][1] - start_time,
+         segment["text"].replace('\u266a', '*'))
+        for segment in transcription_segments
+        if segment["timestamp"][0] >= start_time and segment["timestamp"][1] <= end_time
+    ]
+
+# ----------------------------------------------------------------------------
+# Split the words spoken during a clip into short caption groups.
+#
+# Returns a list of groups, each a list of (start, end, word) relative to
+# the start of the clip.
+# ----------------------------------------------------------------------------
+
+
+def group_words(transcription_segments, start_time, end_time, max_words=GROUP_MAX_WORDS,
+                max_chars=GROUP_MAX_CHARS, pause=GROUP_PAUSE):
+    groups, current, length = [], [], 0
+    for segment in transcription_segments:
+        for start, end, word in iter_words(segment):
+            if not word or start < start_time or end > end_time:
+                continue
+
+            # Start a new group when this one is full or the speaker pauses
+            if current and (len(current) >= max_words or length + 1 + len(word) > max_chars
+                            or start - start_time - current[-1][1] > pause):
+                groups.append(current)
+                current = []
+            length = length + 1 + len(word) if current else len(word)
+            current.append((start - start_time, end - start_time, word))
+
+    if current:
+        groups.append(current)
+    return groups
+
+# ----------------------------------------------------------------------------
+# Create an ASS caption file from word groups, optionally as karaoke.
+# ----------------------------------------------------------------------------
+
+
+def write_ass(groups, ass_path, karaoke=False):
+    def escape(word):
+        return word.replace("\\", "/").replace("{", "(").replace("}", ")")
+
+    # Karaoke words fill in yellow; plain captions are white throughout
+    primary = "&H0000FFFF" if karaoke else "&H00FFFFFF"
+
+    with open(ass_path, 'w', encoding='utf-8') as f:
+        f.write(ASS_HEADER.format(primary=primary))
+        for index, group in enumerate(groups):
+            start, end = group[0][0], group[-1][1]
+
+            # Hold the caption until the next one when the gap is short
+            if index + 1 < len(groups) and groups[index + 1][0][0] - end < GROUP_PAUSE:
+                end = groups[index + 1][0][0]
+
+            if karaoke:
+                # Each word lights up from its start until the next word's
+                following = [word[0] for word in group[1:]] + [end]
+                text = " ".join(
+                    f"{{\\kf{max(1, int(round((next_start - word_start) * 100)))}}}{escape(word)}"
+                    for (word_start, _, word), next_start in zip(group, following))
+            else:
+                text = " ".join(escape(word) for _, _, word in group)
+
+            f.write(f"Dialogue: 0,{format_ass_timestamp(start)},{format_ass_timestamp(end)},"
+                    f"Default,,0,0,0,,{text}\n")
+
+# ----------------------------------------------------------------------------
+# Write a clip's captions in the chosen style (SRT for whole segments,
+# ASS for word groups and karaoke).
+# ----------------------------------------------------------------------------
+
+
+def write_captions(transcription_segments, start_time, end_time, caption_path,
+                   style=DEFAULT_CAPTION_STYLE):
+    if style == "segments":
+        write_srt(segment_subtitles(transcription_segments, start_time, end_time), caption_path)
+    else:
+        write_ass(group_words(transcription_segments, start_time, end_time), caption_path,
+                  karaoke=style == "karaoke")
+    return caption_path
+
 # ----------------------------------------------------------------------------
 # Burn subtitles directly onto the video using ffmpeg.
 # ----------------------------------------------------------------------------
 
 
-def burn_subtitles(video_path, srt_path, output_path):
+def burn_subtitles(video_path, srt_path, output_path, profile=DEFAULT_ENCODE_PROFILE, threads=0):
     srt_path_fixed = srt_path.replace("\\", "/")
+
+    # ASS captions carry their own styling; SRT gets the Impact font
+    subtitle_filter = f"subtitles='{srt_path_fixed}'"
+    if srt_path.endswith(".srt"):
+        subtitle_filter += ":force_style='FontName=Impact'"
+
+    # Re-encode the video with the chosen profile but pass the audio through
+    options = encoder_options(profile, threads)
+    options['c:a'] = 'copy'
+    del options['b:a']
+
     try:
         ffmpeg.input(video_path).output(
             output_path,
-            vf=f"subtitles='{srt_path_fixed}':force_style='FontName=Impact'",
-            **{'c:a': 'copy', 'c:v': 'libx264'}
+            vf=subtitle_filter,
+            **options
         ).overwrite_output().run(capture_stdout=True, capture_stderr=True)
     except ffmpeg.Error as e:
         error_message = e.stderr.decode(
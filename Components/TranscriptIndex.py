@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class TranscriptIndex:
+    # Sorted interval index over transcript segments. Start and end times are
+    # kept in NumPy arrays alongside the latest end among each prefix (so a
+    # long segment is still found when shorter ones after it have ended) and
+    # a prefix sum of word counts. Range queries bisect these arrays instead
+    # of scanning the transcript, so each costs O(log n) plus the segments it
+    # returns. Segments are expected in start order, as Whisper produces
+    # them; append() keeps the index growing while a transcript streams in.
+
+    def __init__(self, segments=()):
+        self.segments = []
+        self._starts = np.empty(64, dtype=np.float64)
+        self._ends = np.empty(64, dtype=np.float64)
+        self._reach = np.empty(64, dtype=np.float64)
+        self._words = np.zeros(65, dtype=np.int64)
+        for segment in segments:
+            self.append(segment)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def append(self, segment):
+        count = len(self.segments)
+
+        # Double the arrays when full, so appending stays amortized O(1)
+        if count == len(self._starts):
+            self._starts = np.resize(self._starts, 2 * count)
+            self._ends = np.resize(self._ends, 2 * count)
+            self._reach = np.resize(self._reach, 2 * count)
+            self._words = np.resize(self._words, 2 * count + 1)
+
+        start, end = segment["timestamp"]
+        self._starts[count] = start
+        self._ends[count] = end
+        self._reach[count] = max(end, self._reach[count - 1]) if count else end
+
+        # Count the words once (from the word timings when we have them)
+        words = len(segment["words"][0]) if "words" in segment else len(segment["text"].split())
+        self._words[count + 1] = self._words[count] + words
+        self.segments.append(segment)
+
+    def _span(self, start_time, end_time):
+        # Indices of the first segment that could reach start_time and one
+        # past the last segment starting by end_time
+        count = len(self.segments)
+        first = int(np.searchsorted(self._reach[:count], start_time, side='left'))
+        last = int(np.searchsorted(self._starts[:count], end_time, side='right'))
+        return first, max(first, last)
+
+    def overlapping(self, start_time, end_time):
+        # Segments that overlap [start_time, end_time] at all
+        first, last = self._span(start_time, end_time)
+        return [self.segments[i] for i in range(first, last) if self._ends[i] >= start_time]
+
+    def snap(self, start_time, end_time):
+        # Move a window onto sentence boundaries: the start forward to the
+        # first segment starting inside it, the end back to the latest end
+        # of the segments before the first one still running at end_time.
+        # Either bound stays put when no segment fits inside the window
+        count = len(self.segments)
+        first = int(np.searchsorted(self._starts[:count], start_time, side='left'))
+        if first < count and self._starts[first] < end_time:
+            start_time = float(self._starts[first])
+
+        # The prefix maxima of the ends are sorted, so the last prefix that
+        # has fully ended by end_time is one bisect away
+        last = int(np.searchsorted(self._reach[:count], end_time, side='right')) - 1
+        if last >= 0 and self._reach[last] > start_time:
+            end_time = float(self._reach[last])
+        return start_time, end_time
+
+    def chunks(self, max_words):
+        # Split the transcript into runs of whole segments of at most
+        # max_words words (a longer segment gets a chunk to itself); each
+        # chunk's end is found by bisecting the word prefix sum
+        count = len(self.segments)
+        words = self._words[:count + 1]
+        bounds, first = [], 0
+        while first < count:
+            last = int(np.searchsorted(words, words[first] + max_words, side='right')) - 1
+            last = min(count, max(last, first + 1))
+            bounds.append((first, last))
+            first = last
+        return [self.segments[first:last] for first, last in bounds]
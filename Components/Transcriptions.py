@@ -1,56 +1,167 @@
-from faster_whisper import WhisperModel
-from Components.Helpers import load_transcription_segments
+import os
+import numpy as np
+from Components.Helpers import load_transcription_segments, save_transcription_segments, pack_words
+from Components.Models import get_whisper_model
+from Components.Pools import get_process_pool
+
+# Sample rate of the waveforms handed to Whisper
+SAMPLE_RATE = 16000
+
+# Parameters that change the transcript (and so are part of its cache key)
+TRANSCRIPTION_PARAMS = {
+    "model": "base.en",
+    "beam_size": 5,
+    "language": "en",
+    "max_new_tokens": 128,
+    "condition_on_previous_text": False,
+    "word_timestamps": True,
+}
+
+# Throughput settings for GPU-less servers: int8 weights, greedy decoding,
+# VAD to skip silence and long audio split into shards across processes
+CPU_TRANSCRIPTION_PARAMS = dict(
+    TRANSCRIPTION_PARAMS,
+    compute_type="int8",
+    beam_size=1,
+    vad_filter=True,
+    shards=4,
+)
+
+# Transcription modes selectable per job
+TRANSCRIPTION_MODES = {
+    "accurate": TRANSCRIPTION_PARAMS,
+    "cpu": CPU_TRANSCRIPTION_PARAMS,
+}
+
+# Size of the transcription worker pool: the most shards any mode asks for
+# (a shorter file just submits fewer shards to it)
+TRANSCRIPTION_POOL_WORKERS = max(params.get("shards", 1) for params in TRANSCRIPTION_MODES.values())
+
+# Shards shorter than this aren't worth a process of their own (seconds)
+MIN_SHARD_SECONDS = 120
+
+# How far from an even split we look for silence to cut at (seconds)
+SPLIT_SEARCH_SECONDS = 30
+
+# Checkpoint a streaming transcription after this many new segments
+CHECKPOINT_SEGMENTS = 25
 
 # ----------------------------------------------------------------
-# Transcribe audio using faster_whisper and save the transcript.
+# Transcribe a waveform (or file) with one model, yielding segments
+# as soon as Whisper produces them.
 # ----------------------------------------------------------------
 
 
-def transcribe_audio(audio_path, transcript_path, st, torch):
-    # If no transcript file exists, transcribe the audio
-    if not __import__("os").path.exists(transcript_path):
-        # Check if a GPU is available, otherwise use the CPU
-        device_str = "cuda" if torch.cuda.is_available() else "cpu"
+def _iter_segments(audio, params, device_str, cpu_threads=0, num_workers=1, offset=0.0):
+    # Get the Whisper model (loaded once per process and kept warm)
+    model = get_whisper_model(params["model"], device=device_str,
+                              compute_type=params.get("compute_type", "default"),
+                              cpu_threads=cpu_threads, num_workers=num_workers)
+
+    # Transcribe the audio (a file path or a 16 kHz mono float32 array)
+    segments, _ = model.transcribe(
+        audio,
+        beam_size=params["beam_size"],
+        language=params["language"],
+        max_new_tokens=params["max_new_tokens"],
+        condition_on_previous_text=params["condition_on_previous_text"],
+        vad_filter=params.get("vad_filter", False),
+        word_timestamps=params.get("word_timestamps", False)
+    )
+
+    # Iterate over each segment in the transcription
+    for seg in segments:
+        # Replace musical notes with empty strings (Since they cause erorrs later)
+        start, end, text = seg.start + offset, seg.end + offset, seg.text.replace(
+            '\u266a', '')
+
+        # Without word timings we're done
+        if not seg.words:
+            yield {"timestamp": [start, end], "text": text}
+            continue
+
+        # The segment text is rebuilt from its words so they slice it exactly
+        pieces = [word.word.replace('\u266a', '') for word in seg.words]
+        yield {"timestamp": [start, end], "text": "".join(pieces),
+               "words": pack_words([word.start + offset for word in seg.words],
+                                   [word.end + offset for word in seg.words], pieces)}
 
-        # Load the Whisper model
-        model = WhisperModel("base.en", device=device_str)
+# ----------------------------------------------------------------
+# Transcribe a waveform (or file) with one model and return segments.
+# ----------------------------------------------------------------
+
+
+def _transcribe(audio, params, device_str, cpu_threads=0, num_workers=1, offset=0.0):
+    return list(_iter_segments(audio, params, device_str, cpu_threads, num_workers, offset))
+
+# ----------------------------------------------------------------
+# Pick shard boundaries at the quietest point near each even split.
+# ----------------------------------------------------------------
 
-        # Transcribe the audio using the Whisper model
-        segments, _ = model.transcribe(
-            audio_path,
-            beam_size=5,
-            language="en",
-            max_new_tokens=128,
-            condition_on_previous_text=False
-        )
 
-        # Convert the segments iterator to a list
-        segments = list(segments)
+def find_shard_boundaries(audio, shards, frame_seconds=0.03):
+    frame = int(SAMPLE_RATE * frame_seconds)
+    frames = len(audio) // frame
 
-        # Initialize an empty list to store the transcription segments
-        transcription_segments = []
+    # Frame energy over the whole waveform in one reshape
+    energy = np.square(audio[:frames * frame].reshape(frames, frame)).mean(axis=1)
 
-        # Initialize an empty string to store the complete transcription
-        transcription = ""
+    search = int(SPLIT_SEARCH_SECONDS / frame_seconds)
+    boundaries = [0]
+    for i in range(1, shards):
+        target = i * frames // shards
+        first, last = max(0, target - search), min(frames, target + search)
+        boundaries.append((first + int(np.argmin(energy[first:last]))) * frame)
+    boundaries.append(len(audio))
+    return boundaries
 
-        # Iterate over each segment in the transcription
-        for seg in segments:
-            # Replace musical notes with empty strings (Since they cause erorrs later)
-            start, end, text = seg.start, seg.end, seg.text.replace(
-                '\u266a', '')
+# ----------------------------------------------------------------
+# Transcribe long audio as shards across a process pool and stitch
+# the results back together with corrected timestamps. The pool is
+# long-lived and always the same size, so each worker keeps one Whisper
+# model (under one registry key) between jobs.
+# ----------------------------------------------------------------
+
+
+def _transcribe_sharded(audio, params, device_str, shards):
+    boundaries = find_shard_boundaries(audio, shards)
+
+    # Split the machine's cores between the pool's worker processes (not the
+    # shards), so a worker's model settings don't change with file length
+    cpu_threads = max(1, (os.cpu_count() or 1) // TRANSCRIPTION_POOL_WORKERS)
+
+    pool = get_process_pool("transcription", TRANSCRIPTION_POOL_WORKERS)
+    futures = [
+        pool.submit(_transcribe, audio[first:last], params, device_str,
+                    cpu_threads, 1, first / SAMPLE_RATE)
+        for first, last in zip(boundaries[:-1], boundaries[1:])
+    ]
+    return [segment for future in futures for segment in future.result()]
+
+# ----------------------------------------------------------------
+# Transcribe audio using faster_whisper and save the transcript.
+# ----------------------------------------------------------------
 
-            # Append the segment information to the list of transcription segments
-            transcription_segments.append(
-                {"timestamp": [start, end], "text": text})
 
-            # Append the segment text to the transcription string with timestamps
-            transcription += f"[{start:.2f} - {end:.2f}] {text}\n"
+def transcribe_audio(audio, transcript_path, st, torch, params=TRANSCRIPTION_PARAMS,
+                     cpu_threads=0, num_workers=1):
+    # If no transcript file exists, transcribe the audio
+    if not os.path.exists(transcript_path):
+        # Check if a GPU is available, otherwise use the CPU
+        device_str = "cuda" if torch.cuda.is_available() else "cpu"
 
-        # Open the transcript file in write mode with UTF-8 encoding
-        with open(transcript_path, 'w', encoding='utf-8') as f:
+        # Shard long in-memory audio on the CPU; otherwise transcribe in one go
+        shards = min(params.get("shards", 1),
+                     int(len(audio) / SAMPLE_RATE // MIN_SHARD_SECONDS)) if isinstance(audio, np.ndarray) else 1
+        if device_str == "cpu" and shards > 1:
+            transcription_segments = _transcribe_sharded(
+                audio, params, device_str, shards)
+        else:
+            transcription_segments = _transcribe(
+                audio, params, device_str, cpu_threads, num_workers)
 
-            # Write the complete transcription to the file
-            f.write(transcription)
+        # Save the transcription segments to the artifact store
+        save_transcription_segments(transcription_segments, transcript_path)
 
         # *** Debugging Message *** #
         print("Transcription Process Was a Success...")
@@ -64,3 +175,55 @@ def transcribe_audio(audio_path, transcript_path, st, torch):
         print("Transcription Already Exists, Using Existing Transcription...")
 
     return transcription_segments
+
+# ----------------------------------------------------------------
+# Stream transcription segments as they are produced, checkpointing
+# them so a crashed run resumes from the last segment.
+# ----------------------------------------------------------------
+
+
+def iter_transcription(audio, transcript_path, torch, params=TRANSCRIPTION_PARAMS,
+                       checkpoint_path=None):
+    # A finished transcript is simply replayed
+    if os.path.exists(transcript_path):
+        # *** Debugging Message *** #
+        print("Transcription Already Exists, Using Existing Transcription...")
+
+        yield from load_transcription_segments(transcript_path)
+        return
+
+    # Check if a GPU is available, otherwise use the CPU
+    device_str = "cuda" if torch.cuda.is_available() else "cpu"
+
+    # Pick up where a previous run stopped
+    transcription_segments = []
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        transcription_segments = load_transcription_segments(checkpoint_path)
+
+        # *** Debugging Message *** #
+        print(
+            f"Resuming Transcription After {len(transcription_segments)} Checkpointed Segments...")
+
+        yield from transcription_segments
+
+    resume_at = transcription_segments[-1]["timestamp"][1] if transcription_segments else 0.0
+
+    since_checkpoint = 0
+    for segment in _iter_segments(audio[int(resume_at * SAMPLE_RATE):], params, device_str,
+                                  offset=resume_at):
+        transcription_segments.append(segment)
+        yield segment
+
+        # Periodically save what we have so far
+        since_checkpoint += 1
+        if checkpoint_path and since_checkpoint >= CHECKPOINT_SEGMENTS:
+            save_transcription_segments(transcription_segments, checkpoint_path)
+            since_checkpoint = 0
+
+    # Save the finished transcript and drop the checkpoint
+    save_transcription_segments(transcription_segments, transcript_path)
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    # *** Debugging Message *** #
+    print("Transcription Process Was a Success...")
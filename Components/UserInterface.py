@@ -1,4 +1,12 @@
 import streamlit as st
+from Components.Transcriptions import TRANSCRIPTION_MODES
+from Components.Edits import ENCODE_PROFILES, DEFAULT_ENCODE_PROFILE
+from Components.Subtitles import CAPTION_STYLES, DEFAULT_CAPTION_STYLE
+from Components.SentimentAnalysis import EMOTION_BACKENDS
+from Components.Highlights import RENDER_POOL_WORKERS
+
+# Profiles a user can pick ("proxy" is only for previews)
+USER_ENCODE_PROFILES = [name for name in ENCODE_PROFILES if name != "proxy"]
 
 ################################################################################
 #                                                                              #
@@ -14,4 +22,89 @@ def render_ui():
     # Provide a video upload option to the user
     uploaded_file = st.file_uploader("Choose a video file (Local)",
                                      type=['mkv', 'mp4', 'mov', 'avi'])
-    return uploaded_file
+
+    # Let the user decide how many clips to make and how many to render at once
+    settings = {
+        "num_clips": st.sidebar.slider("Number of clips", 1, 20, 3),
+        "render_workers": st.sidebar.slider("Render workers", 1, RENDER_POOL_WORKERS, 2),
+        "transcription_mode": st.sidebar.selectbox(
+            "Transcription mode", list(TRANSCRIPTION_MODES),
+            help="'cpu' trades a little accuracy for speed on GPU-less machines"),
+        "encode_profile": st.sidebar.selectbox(
+            "Encode profile", USER_ENCODE_PROFILES,
+            index=USER_ENCODE_PROFILES.index(DEFAULT_ENCODE_PROFILE),
+            help="'draft' encodes fastest, 'publish' gives the smallest, cleanest files"),
+        "emotion_backend": st.sidebar.selectbox(
+            "Emotion backend", EMOTION_BACKENDS,
+            help="'onnx' runs an int8-quantized export of the classifier, faster on CPU"),
+        "caption_style": st.sidebar.selectbox(
+            "Captions", CAPTION_STYLES, index=CAPTION_STYLES.index(DEFAULT_CAPTION_STYLE),
+            help="Short word groups, karaoke (words light up as spoken) or whole sentences"),
+        "preview": st.sidebar.checkbox(
+            "Preview first", False,
+            help="Render quick low-res proxies before the full-size clips (not used when streaming)"),
+        "streaming": st.sidebar.checkbox(
+            "Stream", False,
+            help="Start rendering clips while later audio is still being transcribed"),
+        "show_timings": st.sidebar.checkbox("Show stage timings", False),
+    }
+    return uploaded_file, settings
+
+
+################################################################################
+#                                                                              #
+#             Show the progress (and results) of a background job.             #
+#                                                                              #
+################################################################################
+
+
+def render_progress(job):
+    # Overall progress across every stage
+    st.progress(job.progress(), text=f"Job {job.key[:8]}: {job.status}")
+
+    # One line per stage so the user can see where the time goes
+    for name, state in job.stages.items():
+        st.write(f"**{name}**: {state}")
+
+    if job.status == "failed":
+        st.error(f"Processing failed: {job.error}")
+
+    # Show the proxies while the full-size clips are still encoding
+    if job.previews and job.status != "done":
+        st.caption("Preview (low resolution)")
+        for clip in job.previews:
+            st.video(clip)
+
+    # Show the finished clips
+    if job.status == "done":
+        if not job.result:
+            st.info("No dramatic segments were detected.")
+        for clip in job.result or []:
+            st.video(clip)
+
+
+################################################################################
+#                                                                              #
+#             Summarize the per-stage timings recorded for a job.              #
+#                                                                              #
+################################################################################
+
+
+def render_metrics(records):
+    stages = [r for r in records if r["type"] == "stage"]
+    if not stages:
+        return
+
+    with st.expander("Stage timings", expanded=True):
+        st.table([{
+            "stage": r["stage"],
+            "wall (s)": round(r["wall_seconds"], 2),
+            "cpu (s)": round(r["cpu_seconds"] + r["child_cpu_seconds"], 2),
+            "peak RSS (MB)": round(r["peak_rss_mb"] or 0),
+            "throughput": (f"{r['frames_per_second']:.1f} frames/s" if "frames_per_second" in r else
+                           f"{r['audio_seconds_per_second']:.1f} audio s/s" if "audio_seconds_per_second" in r else ""),
+        } for r in stages])
+
+        hits = sum(1 for r in records if r["type"] == "cache_hit")
+        misses = sum(1 for r in records if r["type"] == "cache_miss")
+        st.write(f"Cache: {hits} hits, {misses} misses")
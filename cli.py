@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from Components.Helpers import get_file_hash
+from Components.Pipeline import new_context, decode_stage, analysis_stage, render_stage, \
+    PIPELINE_STAGES
+from Components.Transcriptions import TRANSCRIPTION_MODES
+from Components.Edits import ENCODE_PROFILES, DEFAULT_ENCODE_PROFILE
+from Components.Subtitles import CAPTION_STYLES, DEFAULT_CAPTION_STYLE
+from Components.SentimentAnalysis import EMOTION_BACKENDS
+from Components.Jobs import Job
+from Components.Models import registry
+from Components.Artifacts import evict_artifacts
+
+# ----------------------------------------------------------------------------
+# Headless batch entry point.
+#
+# Files flow through three threads joined by one-slot queues, so while file N
+# is being transcribed and analysed, file N+1 is already decoding and file
+# N-1 is encoding. Models come from the process-wide registry, so each one is
+# loaded once for the whole batch.
+# ----------------------------------------------------------------------------
+
+# Extensions picked up when the input is a directory
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".mkv", ".webm", ".avi", ".m4v"}
+
+# Where the results manifest goes unless --output is given
+DEFAULT_MANIFEST_PATH = "logs/batch_results.json"
+
+# Marks the end of the input on each queue
+_DONE = object()
+
+# ----------------------------------------------------------------------------
+# Turn a directory or a manifest (.txt with one path per line, or a .json
+# list) into the list of videos to process.
+# ----------------------------------------------------------------------------
+
+
+def collect_inputs(source):
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source)
+                      if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS)
+
+    # Paths in a manifest are relative to the manifest itself
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        if source.endswith(".json"):
+            paths = json.load(f)
+        else:
+            paths = [line.strip() for line in f
+                     if line.strip() and not line.startswith("#")]
+    return [os.path.join(base, path) for path in paths]
+
+# ----------------------------------------------------------------------------
+# Run one pipeline step for every file arriving on a queue.
+#
+# A file that failed upstream passes straight through so it still reaches the
+# manifest in order.
+# ----------------------------------------------------------------------------
+
+
+def _worker(step, inbox, outbox):
+    while True:
+        item = inbox.get()
+        if item is _DONE:
+            outbox.put(_DONE)
+            return
+
+        if item["error"] is None:
+            try:
+                item["ctx"] = step(item)
+            except Exception as e:
+                item["error"] = f"{e}"
+
+                # *** Debugging Message *** #
+                print(f"There Was a Processing Error For {item['path']}: {e}")
+
+        outbox.put(item)
+
+# ----------------------------------------------------------------------------
+# The three pipeline steps, each owning one kind of work.
+# ----------------------------------------------------------------------------
+
+
+def _prepare(item):
+    # Time each file from when it starts decoding, not from when it was queued
+    item["began"] = time.perf_counter()
+    file_hash = get_file_hash(item["path"])
+    item["job"] = Job(file_hash, PIPELINE_STAGES, {})
+    return decode_stage(new_context(item["path"], file_hash, item["settings"]), item["job"])
+
+
+def _analyse(item):
+    return analysis_stage(item["ctx"], item["job"])
+
+
+def _encode(item):
+    item["clips"] = render_stage(item["ctx"], item["job"])
+
+    # Nothing downstream needs the transcript any more
+    return None
+
+# ----------------------------------------------------------------------------
+# Summarise one processed file for the results manifest.
+# ----------------------------------------------------------------------------
+
+
+def _result(item):
+    job = item.get("job")
+    records = job.metrics.records if job is not None else []
+    return {
+        "path": item["path"],
+        "file_hash": job.key if job is not None else None,
+        "status": "failed" if item["error"] else "done",
+        "error": item["error"],
+        "clips": item.get("clips", []),
+        "stages": dict(job.stages) if job is not None else {},
+        "timings": {r["stage"]: r["wall_seconds"] for r in records if r["type"] == "stage"},
+        "cache": {r["stage"]: r["type"] == "cache_hit" for r in records
+                  if r["type"] in ("cache_hit", "cache_miss") and r["stage"] != "render"},
+        "wall_seconds": time.perf_counter() - item["began"] if "began" in item else 0.0,
+    }
+
+# ----------------------------------------------------------------------------
+# Process every video and write the results manifest.
+# ----------------------------------------------------------------------------
+
+
+def run_batch(paths, settings, manifest_path=DEFAULT_MANIFEST_PATH):
+    # Create a directory named 'temp_files' if it doesn't exist
+    os.makedirs("temp_files", exist_ok=True)
+
+    # Keep temp_files/ within its size budget before the batch adds to it
+    evict_artifacts()
+
+    # One-slot queues keep at most one file waiting between each pair of steps
+    decoded, analysed, encoded = queue.Queue(
+        maxsize=1), queue.Queue(maxsize=1), queue.Queue()
+    inputs = queue.Queue()
+    threads = [
+        threading.Thread(target=_worker, args=(step, inbox, outbox),
+                         name=f"batch-{name}", daemon=True)
+        for name, step, inbox, outbox in (("decode", _prepare, inputs, decoded),
+                                          ("inference", _analyse, decoded, analysed),
+                                          ("encode", _encode, analysed, encoded))
+    ]
+    for thread in threads:
+        thread.start()
+
+    began = time.perf_counter()
+    for path in paths:
+        inputs.put({"path": path, "settings": settings, "error": None})
+    inputs.put(_DONE)
+
+    results = []
+    while True:
+        item = encoded.get()
+        if item is _DONE:
+            break
+        results.append(_result(item))
+
+        # *** Debugging Message *** #
+        print(f"Finished {item['path']} ({len(results)}/{len(paths)})")
+
+    manifest = {
+        "settings": settings,
+        "wall_seconds": time.perf_counter() - began,
+        "model_registry": registry.snapshot(),
+        "files": results,
+    }
+
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # *** Debugging Message *** #
+    print(f"Results Manifest Written To: {manifest_path}")
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate shorts for a directory (or manifest) of videos.")
+    parser.add_argument("source",
+                        help="directory of videos, or a .txt/.json manifest of paths")
+    parser.add_argument("--clips", type=int, default=3,
+                        help="number of clips per video")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="clips rendered in parallel per video")
+    parser.add_argument("--transcription-mode", choices=sorted(TRANSCRIPTION_MODES),
+                        default="accurate")
+    parser.add_argument("--emotion-backend", choices=EMOTION_BACKENDS, default="torch",
+                        help="'onnx' runs an int8 export of the classifier on CPU")
+    parser.add_argument("--profile", choices=sorted(ENCODE_PROFILES),
+                        default=DEFAULT_ENCODE_PROFILE, help="encode profile for the clips")
+    parser.add_argument("--captions", choices=CAPTION_STYLES, default=DEFAULT_CAPTION_STYLE,
+                        help="caption style: word groups, karaoke or whole segments")
+    parser.add_argument("--output", default=DEFAULT_MANIFEST_PATH,
+                        help="where to write the JSON results manifest")
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.source)
+    if not paths:
+        parser.error(f"no videos found in {args.source}")
+
+    settings = {
+        "num_clips": args.clips,
+        "render_workers": args.workers,
+        "transcription_mode": args.transcription_mode,
+        "emotion_backend": args.emotion_backend,
+        "encode_profile": args.profile,
+        "caption_style": args.captions,
+        "streaming": False,
+    }
+    manifest = run_batch(paths, settings, args.output)
+
+    # Exit non-zero if any file failed so scripts can notice
+    failed = sum(1 for result in manifest["files"] if result["status"] == "failed")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
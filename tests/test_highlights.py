@@ -0,0 +1,39 @@
+from Components.Highlights import IncrementalHighlighter, select_highlights
+from Components.TranscriptIndex import TranscriptIndex
+
+
+def timeline(seconds, label, score, prosody):
+    return [{"start": t, "end": t + 4.0, "label": label, "score": score, "prosody": prosody}
+            for t in range(0, seconds, 4)]
+
+
+def stream(highlighter, emotions):
+    committed = []
+    for emotion in emotions:
+        committed += highlighter.add([emotion])
+    return committed
+
+
+def test_prosody_alone_does_not_commit_early():
+    # Animated speech with no dramatic emotion clears the old fused threshold
+    highlighter = IncrementalHighlighter(top_n=2, clip_length=59)
+    assert stream(highlighter, timeline(600, "neutral", 0.9, 0.6)) == []
+
+    # ...but is still picked once the whole timeline is known
+    assert len(highlighter.finish()) == 2
+
+
+def test_dramatic_emotion_commits_early():
+    highlighter = IncrementalHighlighter(top_n=1, clip_length=59)
+    assert len(stream(highlighter, timeline(600, "anger", 0.9, 0.6))) == 1
+
+
+def test_highlights_snap_to_sentences_after_cuts():
+    emotions = timeline(120, "anger", 0.9, 0.0)
+    transcript = TranscriptIndex({"timestamp": [e["start"], e["end"]], "text": "words"}
+                                 for e in emotions)
+
+    # A cut 1.5 s into the first segment pulls the start mid-sentence
+    highlight, = select_highlights(emotions, top_n=1, clip_length=59, cut_times=[1.5],
+                                   transcript=transcript)
+    assert (highlight["start"], highlight["end"]) == (4.0, 56.0)
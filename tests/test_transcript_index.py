@@ -0,0 +1,27 @@
+from Components.TranscriptIndex import TranscriptIndex
+
+
+def segments(*bounds):
+    return [{"timestamp": [start, end], "text": "some words here"} for start, end in bounds]
+
+
+def test_snap_moves_start_forward_to_a_segment_start():
+    index = TranscriptIndex(segments((0, 5), (5, 12), (12, 20)))
+    start, _ = index.snap(6.5, 20)
+    assert start == 12
+
+
+def test_snap_moves_end_back_to_the_last_finished_segment():
+    index = TranscriptIndex(segments((0, 5), (5, 12), (12, 20)))
+    assert index.snap(0, 15) == (0, 12)
+
+
+def test_snap_ends_before_a_segment_still_running():
+    # (2, 9) ends inside the window, but (1, 30) started earlier and is cut
+    index = TranscriptIndex(segments((0, 4), (1, 30), (2, 9)))
+    assert index.snap(0, 20) == (0, 4)
+
+
+def test_snap_keeps_bounds_when_no_segment_fits():
+    index = TranscriptIndex(segments((0, 40)))
+    assert index.snap(10, 30) == (10, 30)